@@ -442,6 +442,7 @@ write_files:
       DATABASE_NAME={database_name}
       SNS_TOPIC_ARN={sns_topic_arn}
       AWS_PROFILE_NAME={aws_profile_name}
+      TRUSTED_PROXY_COUNT=1
 
 runcmd:
   - "echo 'Executing run commands...' >> /var/log/user_data.log"
@@ -1,46 +1,139 @@
+import os
+from collections import namedtuple
 from datetime import datetime
 from functools import wraps
-from flask import Flask, request, abort
+from flask import Flask, Response, request, abort, g, stream_with_context
 from flask_migrate import Migrate
-from sqlalchemy import text
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy import bindparam, delete, insert, select, tuple_, update
 from app.models import User, Assignment, Submission
+from app.assignment_cache import assignment_cache
+from app.auth_executor import AuthExecutorSaturated
+from app.commands import register_commands
+from app.db_pool import build_engine_options, enforce_sqlite_foreign_keys, instrument_pool
+from app.db_routing import PIN_COOKIE, READ_ONLY_METHODS, replica_router
+from app.health import readiness_probe
+from app.idempotency import idempotency, idempotent
+from app.json_provider import FastJSONProvider
+from app.outbox import outbox
+from app.purge import assignment_purger
+from app.rate_limit import RateLimited
+from app.sql_profiler import sql_profiler
+from app.startup import StartupReport, ensure_ready
 from uuid import uuid4
 from sqlalchemy.exc import SQLAlchemyError
-from app.extensions import db, bcrypt, logger, statsd, publish_to_sns
+from app.extensions import (
+    db,
+    bcrypt,
+    auth_executor,
+    credential_cache,
+    build_sns_message,
+    logger,
+    rate_limiter,
+    request_metrics,
+    statsd,
+)
 from config import Config
 from helper_func import (
     create_response,
-    load_users_from_csv,
+    create_rows_response,
+    decode_cursor,
+    encode_cursor,
+    parse_page_limit,
+    set_default_headers,
+    validate_assignment_fields,
     validate_datetime_format,
     is_valid_email,
     is_valid_password,
 )
 
+# Lightweight identity attached to the request by basic_auth_required
+Principal = namedtuple("Principal", ["id", "email"])
+
 
 def create_app(config_class=Config):
-    app = Flask(__name__)
-    app.config.from_object(config_class)
+    report = StartupReport(statsd)
+    with report.phase("config"):
+        app = Flask(__name__)
+        app.config.from_object(config_class)
+        app.json = FastJSONProvider(app)
+        # Behind the ALB remote_addr is the load balancer; take the client from its X-Forwarded-For
+        if app.config["TRUSTED_PROXY_COUNT"]:
+            proxies = app.config["TRUSTED_PROXY_COUNT"]
+            app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
 
     logger.info('Flask app "MyFlaskApp" starting up.')
     logger.info("Using config: %s", config_class)
 
-    db.init_app(app)
-    bcrypt.init_app(app)
-
-    Migrate(app, db)
-
-    with app.app_context():
-        db.create_all()
-        load_users_from_csv()
-        logger.info("Connected to database successfully.")
-
+    with report.phase("extensions"):
+        # Explicit SQLALCHEMY_ENGINE_OPTIONS entries win over the DB_POOL_* settings
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            **build_engine_options(app.config),
+            **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+        }
+        db.init_app(app)
+        sql_profiler.init_app(app)
+        with app.app_context():
+            for bind_key, engine in db.engines.items():
+                instrument_pool(engine, bind_key or "primary")
+                enforce_sqlite_foreign_keys(engine)
+                request_metrics.instrument_engine(engine)
+                sql_profiler.instrument_engine(engine)
+        statsd.init_app(app)
+        request_metrics.init_app(app)
+        replica_router.init_app(app)
+        bcrypt.init_app(app)
+        credential_cache.init_app(app)
+        rate_limiter.init_app(app)
+        auth_executor.init_app(app)
+
+        Migrate(app, db, directory=os.path.join(os.path.dirname(app.root_path), "migrations"))
+        register_commands(app)
+        outbox.init_app(app)
+        assignment_purger.init_app(app)
+        readiness_probe.init_app(app)
+        assignment_cache.init_app(app)
+        idempotency.init_app(app)
+
+    @app.before_request
+    def require_ready():
+        # A no-op once ready; until the schema has been migrated only /livez is served
+        if request.endpoint != "liveness_check" and not ensure_ready(app):
+            abort(503, description="Database schema is not at the latest migration")
+
+    if not app.config["LAZY_INIT"]:
+        ensure_ready(app, report)
+
+    report.emit()
     logger.info("Flask app ready to serve requests.")
 
+    def read_write_principal():
+        """ Key used to pin a client's reads to the primary after it writes """
+        auth = request.authorization
+        return auth.username.lower() if auth and auth.username else request.remote_addr
+
+    @app.before_request
+    def route_reads_to_replicas():
+        if replica_router.enabled and request.method in READ_ONLY_METHODS:
+            replica_router.use_replica(read_write_principal(), request.cookies.get(PIN_COOKIE))
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if (
+            replica_router.enabled
+            and request.method not in READ_ONLY_METHODS
+            and response.status_code < 400
+        ):
+            replica_router.pin(read_write_principal(), response)
+        return response
+
     # API's Implementation starts here
     def basic_auth_required(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             auth = request.authorization
+            client_ip = request.remote_addr or "unknown"
+            rate_limiter.check_ip(client_ip)
 
             if not auth or not auth.username or not auth.password:
                 abort(401, description="Missing Basic Auth credentials")
@@ -50,52 +143,202 @@ def create_app(config_class=Config):
 
             if not is_valid_password(auth.password):
                 abort(400, description="Invalid password format")
-            try:
-                user = User.query.filter_by(email=auth.username).first()
-            except SQLAlchemyError:
-                abort(503, description="Database connection error")
 
-            if not user or not user.verify_password(auth.password):
-                abort(401, description="Invalid email or password")
+            # Before any DB or bcrypt work, so repeated bad logins stay cheap
+            rate_limiter.check_backoff(auth.username)
+            with request_metrics.stage("auth"):
+                try:
+                    user = User.query.filter_by(email=auth.username).first()
+                except SQLAlchemyError:
+                    abort(503, description="Database connection error")
+
+                if not user:
+                    rate_limiter.record_failure(auth.username, client_ip)
+                    abort(401, description="Invalid email or password")
+
+                # Skip bcrypt when these exact credentials were verified recently
+                if not credential_cache.lookup(auth.username, auth.password, user):
+                    # Recently verified credentials skip this, so one noisy client
+                    # cannot lock out everyone else behind its address
+                    rate_limiter.check_ip_backoff(client_ip)
+                    try:
+                        with request_metrics.stage("bcrypt"):
+                            verified = user.verify_password(auth.password)
+                    except AuthExecutorSaturated:
+                        abort(503, description="Authentication is temporarily overloaded")
+                    if not verified:
+                        rate_limiter.record_failure(auth.username, client_ip)
+                        abort(401, description="Invalid email or password")
+                    rate_limiter.record_success(auth.username)
+                    credential_cache.store(auth.username, auth.password, user)
+
+            rate_limiter.check_user(user.email)
+
+            # Handlers reuse this instead of re-authenticating
+            g.current_user = Principal(id=user.id, email=user.email)
 
             return fn(*args, **kwargs)
 
         return wrapper
 
-    def get_user_id_from_basic_auth():
-        auth = request.authorization
-        if not auth:
-            return None
+    def get_current_user():
+        """ Return the principal resolved by basic_auth_required, if any """
+        return g.get("current_user")
 
-        user = User.query.filter_by(email=auth.username).first()
-        if not user or not user.verify_password(auth.password):
-            return None
-        return user.id
+    # Assignment API's Read
+    def assignments_after_cursor(query, cursor):
+        """ Order by the (assignment_created, id) keyset, resuming after a cursor """
+        query = query.where(Assignment.is_live()).order_by(
+            Assignment.assignment_created, Assignment.id
+        )
+        if cursor is None:
+            return query
 
-    def get_email_from_basic_auth():
-        auth = request.authorization
-        if not auth:
-            return None
-        return auth.username
+        values = decode_cursor(cursor)
+        try:
+            created, last_id = values
+            created = datetime.fromisoformat(created)
+        except (TypeError, ValueError):
+            abort(400, description="Invalid pagination cursor")
+        return query.where(
+            tuple_(Assignment.assignment_created, Assignment.id)
+            > tuple_(created, str(last_id))
+        )
+
+    def submissions_page(query):
+        """ One keyset page of submission rows on (submission_date, id), filtered by ?since=/?until= """
+        limit = parse_page_limit(
+            request.args.get("limit"),
+            app.config["SUBMISSIONS_PAGE_DEFAULT_LIMIT"],
+            app.config["SUBMISSIONS_PAGE_MAX_LIMIT"],
+        )
+        if limit is None:
+            abort(400, description="limit must be a positive integer")
+
+        for arg, compare in (("since", Submission.submission_date.__ge__),
+                             ("until", Submission.submission_date.__lt__)):
+            if arg in request.args:
+                valid_flag, bound = validate_datetime_format(request.args[arg])
+                if not valid_flag:
+                    abort(400, description=f"Invalid {arg} format")
+                query = query.where(compare(bound))
+
+        cursor = request.args.get("cursor")
+        if cursor is not None:
+            values = decode_cursor(cursor)
+            try:
+                submitted, last_id = values
+                submitted = datetime.fromisoformat(submitted)
+                last_id = int(last_id)
+            except (TypeError, ValueError):
+                abort(400, description="Invalid pagination cursor")
+            query = query.where(
+                tuple_(Submission.submission_date, Submission.id) > tuple_(submitted, last_id)
+            )
+
+        query = query.order_by(Submission.submission_date, Submission.id).limit(limit + 1)
+        rows = db.session.execute(query).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        response = create_rows_response(200, Submission.SERIALIZED_COLUMNS, rows)
+        if has_more:
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.submission_date, last.id)
+        return response
+
+    def is_not_modified(etag):
+        """ True when the client's If-None-Match already matches this validator """
+        return request.if_none_match.contains_weak(etag)
+
+    def stream_assignments(stream_format, cursor, etag):
+        """ Yield assignments in chunks from a server-side cursor """
+        chunk_size = app.config["ASSIGNMENTS_STREAM_CHUNK_SIZE"]
+        columns = Assignment.SERIALIZED_COLUMNS
+        query = assignments_after_cursor(select(*Assignment.projection()), cursor)
+        rows = db.session.execute(query.execution_options(yield_per=chunk_size))
+
+        def generate():
+            ndjson = stream_format == "ndjson"
+            first = True
+            if not ndjson:
+                yield b"["
+            # Plain row tuples, so there are no ORM objects to accumulate
+            for partition in rows.partitions():
+                if ndjson:
+                    yield b"".join(
+                        app.json.dumps_bytes(dict(zip(columns, row))) + b"\n"
+                        for row in partition
+                    )
+                else:
+                    encoded = app.json.dumps_rows(columns, partition)[1:-1]
+                    yield encoded if first else b"," + encoded
+                first = False
+            if not ndjson:
+                yield b"]"
+
+        mimetype = "application/x-ndjson" if stream_format == "ndjson" else "application/json"
+        response = Response(stream_with_context(generate()), mimetype=mimetype)
+        return set_default_headers(response, etag)
 
     # Assignment API's Read
     @app.route("/v1/assignments", methods=["GET"])
     @basic_auth_required
     def get_assignments():
         statsd.incr(".assignments.get")
-        assignments = Assignment.query.all()
-        logger.info("Assignments retrieved successfully.")
-        return create_response(
-            200, [assignment.serialize() for assignment in assignments]
+        cursor = request.args.get("cursor")
+        stream_format = request.args.get("stream")
+
+        # The query string is part of the validator since it selects the page
+        etag = Assignment.collection_etag(request.query_string.decode("utf-8"))
+        if is_not_modified(etag):
+            return create_response(304, etag=etag)
+
+        if stream_format is not None:
+            if stream_format not in ("ndjson", "json"):
+                abort(400, description="stream must be 'ndjson' or 'json'")
+            logger.info("Streaming assignments.")
+            return stream_assignments(stream_format, cursor, etag)
+
+        columns = Assignment.SERIALIZED_COLUMNS
+        if cursor is None and "limit" not in request.args:
+            rows = db.session.execute(
+                select(*Assignment.projection()).where(Assignment.is_live())
+            ).all()
+            logger.info("Assignments retrieved successfully.")
+            return create_rows_response(200, columns, rows, etag)
+
+        limit = parse_page_limit(
+            request.args.get("limit"),
+            app.config["ASSIGNMENTS_PAGE_DEFAULT_LIMIT"],
+            app.config["ASSIGNMENTS_PAGE_MAX_LIMIT"],
         )
+        if limit is None:
+            abort(400, description="limit must be a positive integer")
+
+        query = assignments_after_cursor(select(*Assignment.projection()), cursor)
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        logger.info("Assignments retrieved successfully.")
+        response = create_rows_response(200, columns, rows, etag)
+        if has_more:
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(
+                last.assignment_created, last.id
+            )
+        return response
 
     @app.route("/v1/assignments/<string:ass_id>", methods=["GET"])
     @basic_auth_required
     def get_assignment(ass_id):
         statsd.incr(".assignments.get")
-        assignment = Assignment.query.get_or_404(ass_id)
+        assignment = Assignment.get_cached_or_404(ass_id)
+        if is_not_modified(assignment.etag):
+            return create_response(304, etag=assignment.etag)
         logger.info("Assignment retrieved successfully.")
-        return create_response(200, assignment.serialize())
+        return create_response(200, assignment.serialize(), assignment.etag)
 
     # Assignment API's Update
 
@@ -103,8 +346,8 @@ def create_app(config_class=Config):
     @basic_auth_required
     def update_assignment(ass_id):
         statsd.incr(".assignments.update")
-        assignment = Assignment.query.get_or_404(ass_id)
-        current_user_id = get_user_id_from_basic_auth()
+        assignment = Assignment.get_live_or_404(ass_id)
+        current_user_id = get_current_user().id
 
         if assignment.created_by != current_user_id:
             abort(
@@ -114,31 +357,21 @@ def create_app(config_class=Config):
 
         data = request.get_json()
 
-        # Check if all necessary arguments are present and not empty
-        necessary_args = ["name", "points", "num_of_attempts", "deadline"]
-        for arg in necessary_args:
-            if not data.get(arg) or data[arg] == "":
-                abort(400, description="Missing required fields")
+        # Updates have never range-checked points and attempts
+        error, fields = validate_assignment_fields(data, check_ranges=False)
+        if error:
+            abort(400, description=error)
 
         # If all checks passed, update the assignment attributes
-        assignment.name = data["name"]
-        assignment.points = data["points"]
-        assignment.num_of_attempts = data["num_of_attempts"]
-        assignment.deadline = data["deadline"]
-
-        try:
-            valid_flag, processed_deadline = validate_datetime_format(data["deadline"])
+        assignment.name = fields["name"]
+        assignment.points = fields["points"]
+        assignment.num_of_attempts = fields["num_of_attempts"]
+        assignment.deadline = fields["deadline"]
 
-            if not valid_flag:
-                abort(400, description="Invalid deadline format")
-            assignment.deadline = processed_deadline
-        except ValueError:
-            abort(400, description="Invalid deadline format")
-
-        assignment.assignment_updated = datetime.utcnow().strftime(
-            "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
+        assignment.assignment_updated = datetime.utcnow()
+        assignment.version = Assignment.version + 1
         db.session.commit()
+        assignment_cache.invalidate(ass_id)
         logger.info("Assignment updated successfully.")
 
         return create_response(204)
@@ -152,8 +385,8 @@ def create_app(config_class=Config):
         if request.data or request.args:
             abort(400, description="Request body must be empty")
 
-        assignment = Assignment.query.get_or_404(ass_id)
-        current_user_id = get_user_id_from_basic_auth()
+        assignment = Assignment.get_live_or_404(ass_id)
+        current_user_id = get_current_user().id
 
         if assignment.created_by != current_user_id:
             abort(
@@ -161,11 +394,15 @@ def create_app(config_class=Config):
                 description="Forbidden: You do not have permissions to delete this assignment",
             )
 
-        # Delete all related submissions first
-        Submission.query.filter_by(assignment_id=ass_id).delete()
-
-        db.session.delete(assignment)
+        if app.config["ASSIGNMENTS_SOFT_DELETE"]:
+            # Submissions are removed in batches by the purge job, off the request path
+            assignment.deleted_at = datetime.utcnow()
+            assignment.version = Assignment.version + 1
+        else:
+            # ON DELETE CASCADE removes the submissions in the same statement
+            db.session.execute(delete(Assignment).where(Assignment.id == ass_id))
         db.session.commit()
+        assignment_cache.invalidate(ass_id)
         logger.info("Assignment deleted successfully.")
         return create_response(204)
 
@@ -173,49 +410,105 @@ def create_app(config_class=Config):
 
     @app.route("/v1/assignments", methods=["POST"])
     @basic_auth_required
+    @idempotent
     def create_assignment():
         statsd.incr(".assignments.create")
         data = request.get_json()
-        if not data:
-            abort(400, description="Request body must be present")
-        name = data.get("name")
-        points = data.get("points")
-        num_of_attempts = data.get("num_of_attempts")
-        deadline = data.get("deadline")
-
-        if not all([name, points, num_of_attempts, deadline]):
-            abort(400, description="Missing required fields")
+        error, fields = validate_assignment_fields(data)
+        if error:
+            abort(400, description=error)
 
-        if not (1 <= points <= 10):
-            abort(400, description="Points must be between 1 and 10")
+        current_user_id = get_current_user().id
+        assignment = Assignment(id=str(uuid4()), created_by=current_user_id, **fields)
+        assignment.assignment_updated = datetime.utcnow()
+        db.session.add(assignment)
+        response = idempotency.commit_response(lambda: create_response(201, assignment.serialize()))
+        logger.info("Assignment created successfully.")
+        return response
 
-        if not (1 <= num_of_attempts <= 10):
-            abort(400, description="Number of attempts must be between 1 and 10")
+    # Assignment API's Batch create/update
 
-        try:
-            valid_flag, processed_deadline = validate_datetime_format(deadline)
-
-            if not valid_flag:
-                abort(400, description="Invalid deadline format")
-        except ValueError:
-            abort(400, description="Invalid deadline format")
-
-        current_user_id = get_user_id_from_basic_auth()
-        assignment = Assignment(
-            id=str(uuid4()),
-            name=name,
-            points=points,
-            num_of_attempts=num_of_attempts,
-            deadline=processed_deadline,
-            created_by=current_user_id,
-        )
-        assignment.assignment_updated = datetime.utcnow().strftime(
-            "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
-        db.session.add(assignment)
+    @app.route("/v1/assignments:batch", methods=["POST"])
+    @basic_auth_required
+    def batch_assignments():
+        statsd.incr(".assignments.batch")
+        data = request.get_json(silent=True)
+        operations = data.get("operations") if isinstance(data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            abort(400, description="operations must be a non-empty list")
+        max_size = app.config["ASSIGNMENTS_BATCH_MAX_SIZE"]
+        if len(operations) > max_size:
+            abort(400, description=f"A batch may contain at most {max_size} operations")
+
+        current_user_id = get_current_user().id
+        now = datetime.utcnow()
+        results = [None] * len(operations)
+        creates, updates = [], []
+
+        update_ids = [
+            op.get("id") for op in operations
+            if isinstance(op, dict) and op.get("op") == "update" and isinstance(op.get("id"), str)
+        ]
+        # One query resolves ownership for every update in the batch
+        owners = dict(
+            db.session.execute(
+                select(Assignment.id, Assignment.created_by)
+                .where(Assignment.id.in_(update_ids), Assignment.is_live())
+            ).all()
+        ) if update_ids else {}
+
+        for index, op in enumerate(operations):
+            action = op.get("op") if isinstance(op, dict) else None
+            if action not in ("create", "update"):
+                results[index] = {"status": 400, "error": "op must be 'create' or 'update'"}
+                continue
+            error, fields = validate_assignment_fields(
+                op.get("data"), check_ranges=action == "create"
+            )
+            if error:
+                results[index] = {"status": 400, "error": error}
+                continue
+
+            if action == "create":
+                row = dict(fields, id=str(uuid4()), created_by=current_user_id,
+                           assignment_created=now, assignment_updated=now)
+                creates.append(row)
+                results[index] = {
+                    "status": 201, "id": row["id"], "assignment": Assignment(**row).serialize()
+                }
+                continue
+
+            ass_id = op.get("id")
+            if ass_id not in owners:
+                results[index] = {"status": 404, "id": ass_id, "error": "Assignment not found"}
+            elif owners[ass_id] != current_user_id:
+                results[index] = {
+                    "status": 403, "id": ass_id,
+                    "error": "You do not have permissions to update this assignment",
+                }
+            else:
+                updates.append(dict(fields, b_id=ass_id, assignment_updated=now))
+                results[index] = {"status": 204, "id": ass_id}
+
+        # Everything valid goes out in one transaction: a bulk INSERT and an executemany UPDATE
+        if creates:
+            db.session.execute(insert(Assignment), creates)
+        if updates:
+            table = Assignment.__table__
+            # SET takes the remaining parameter keys; b_id only feeds the WHERE clause
+            db.session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(version=table.c.version + 1),
+                updates,
+            )
         db.session.commit()
-        logger.info("Assignment created successfully.")
-        return create_response(201, assignment.serialize())
+        assignment_cache.invalidate(*(row["b_id"] for row in updates))
+        logger.info(
+            "Assignment batch applied: %d created, %d updated, %d rejected.",
+            len(creates), len(updates), len(operations) - len(creates) - len(updates),
+        )
+        return create_response(200, {"results": results})
 
     # Health Check API
     @app.route("/healthz", methods=["GET"])
@@ -223,21 +516,69 @@ def create_app(config_class=Config):
         if request.data or request.args:
             abort(400, description="Request body must be empty")
         statsd.incr(".healthz")
-        try:
-            db.session.execute(text("SELECT * FROM user;"))
-            return create_response(200)
-        except SQLAlchemyError:
+        if not readiness_probe.ping():
             abort(503, description="Database connection error")
+        return create_response(200)
+
+    # Liveness: the process is up and serving, no I/O
+    @app.route("/livez", methods=["GET"])
+    def liveness_check():
+        if request.data or request.args:
+            abort(400, description="Request body must be empty")
+        statsd.incr(".livez")
+        return create_response(200)
+
+    # Readiness: cached database probe plus connection-pool saturation
+    @app.route("/readyz", methods=["GET"])
+    def readiness_check():
+        if request.data or request.args:
+            abort(400, description="Request body must be empty")
+        statsd.incr(".readyz")
+        ready, details = readiness_probe.check()
+        if not ready:
+            statsd.incr(".readyz.unavailable")
+            logger.error("Readiness check failed: %s", details)
+        return create_response(200 if ready else 503, details)
+
+    @app.route("/v1/assignments/<string:ass_id>/submissions", methods=["GET"])
+    @basic_auth_required
+    def get_assignment_submissions(ass_id):
+        statsd.incr(".submissions.list")
+        assignment = Assignment.get_cached_or_404(ass_id)
+        if assignment.created_by != get_current_user().id:
+            abort(
+                403,
+                description="Forbidden: Only the assignment's creator can list its submissions",
+            )
+        logger.info("Assignment submissions retrieved successfully.")
+        return submissions_page(
+            select(*Submission.projection()).where(Submission.assignment_id == ass_id)
+        )
+
+    @app.route("/v1/submissions", methods=["GET"])
+    @basic_auth_required
+    def get_my_submissions():
+        statsd.incr(".submissions.list")
+        query = (
+            select(*Submission.projection())
+            .join(Assignment, Assignment.id == Submission.assignment_id)
+            .where(Submission.user_id == get_current_user().id, Assignment.is_live())
+        )
+        if "assignment_id" in request.args:
+            query = query.where(Submission.assignment_id == request.args["assignment_id"])
+        logger.info("Submissions retrieved successfully.")
+        return submissions_page(query)
 
     @app.route("/v1/assignments/<string:ass_id>/submission", methods=["POST"])
     @basic_auth_required
+    @idempotent
     def create_submission(ass_id):
         statsd.incr(".submissions.create")
         data = request.get_json()
         if not data:
             abort(400, description="Request body must be present")
 
-        assignment = Assignment.query.get_or_404(ass_id)
+        assignment = Assignment.get_cached_or_404(ass_id)
         submission_url = data.get("submission_url")
 
         if not submission_url:
@@ -246,33 +587,40 @@ def create_app(config_class=Config):
         if assignment.deadline <= datetime.utcnow():
             abort(400, description="Deadline has passed for this assignment")
 
-        previous_submissions = Submission.query.filter_by(assignment_id=ass_id).all()
+        current_user = get_current_user()
+        # Held until commit so concurrent submissions cannot exceed the limit
+        Submission.lock_attempts(ass_id, current_user.id)
+        previous_attempts = Submission.count_attempts(ass_id, current_user.id)
 
-        attempts_left = assignment.num_of_attempts - len(previous_submissions)
+        attempts_left = assignment.num_of_attempts - previous_attempts
 
         if attempts_left <= 0:
             abort(400, description="No attempts left for this assignment")
 
-        submission_date = (
-            previous_submissions[-1].submission_date
-            if previous_submissions
-            else datetime.utcnow()
-        )
+        assignment_name = assignment.name
         submission = Submission(
             assignment_id=ass_id,
+            user_id=current_user.id,
             submission_url=submission_url,
-            submission_date=submission_date,
+            submission_date=datetime.utcnow(),
             assignment_updated=datetime.utcnow(),
         )
         db.session.add(submission)
-        db.session.commit()
+        # Committed atomically with the submission and published in the background
+        outbox.enqueue(
+            build_sns_message(
+                submission_url,
+                current_user.email,
+                ass_id,
+                assignment_name,
+                previous_attempts,
+            )
+        )
+        response = idempotency.commit_response(lambda: create_response(201, submission.serialize()))
+        outbox.wake()
         logger.info("Submission created successfully.")
-        # get email based on user id
-        username = get_email_from_basic_auth()
-        publish_to_sns(submission_url, username, ass_id, assignment.name, len(previous_submissions))
-        logger.info("SNS message published successfully.")
 
-        return create_response(201, submission.serialize())
+        return response
 
     # Error Handling
     @app.errorhandler(400)
@@ -313,6 +661,18 @@ def create_app(config_class=Config):
             },
         )
 
+    @app.errorhandler(409)
+    def conflict_error(error):
+        statsd.incr(".error.409")
+        logger.error("Error processing request: %s", error)
+        return create_response(409, {"error": "Conflict", "message": str(error)})
+
+    @app.errorhandler(422)
+    def unprocessable_entity_error(error):
+        statsd.incr(".error.422")
+        logger.error("Error processing request: %s", error)
+        return create_response(422, {"error": "Unprocessable Entity", "message": str(error)})
+
     @app.errorhandler(500)
     def internal_server_error(error):
         statsd.incr(".error.500")
@@ -325,6 +685,17 @@ def create_app(config_class=Config):
             },
         )
 
+    @app.errorhandler(RateLimited)
+    def too_many_requests_error(error):
+        statsd.incr(".error.429")
+        logger.warning("Rejected request: %s", error)
+        response = create_response(
+            429,
+            {"error": "Too Many Requests", "message": "Too many requests, retry later"},
+        )
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response
+
     @app.errorhandler(503)
     def internal_server_error_503(error):
         statsd.incr(".error.503")
@@ -0,0 +1,120 @@
+"""Serve the synchronous Flask app from an ASGI server on a bounded thread pool
+
+Nothing here is asynchronous: each request still occupies one pool thread
+from start to finish, exactly as under gunicorn's gthread worker. What the
+asyncio server adds is that idle keep-alive connections and slow request
+bodies are held by the event loop instead of a thread. Compare both modes,
+at the same thread count, with benchmarks/serving_bench.py.
+"""
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+
+def build_environ(scope, body):
+    """ The WSGI environ for an ASGI http scope and its (seekable) request body """
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1")
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        if key in environ:
+            # Repeated headers fold with commas, except Cookie, whose pairs are separated by "; "
+            separator = "; " if key == "HTTP_COOKIE" else ","
+            value = f"{environ[key]}{separator}{value}"
+        environ[key] = value
+    return environ
+
+
+class PooledWsgiToAsgi:
+    """ ASGI application running a WSGI app on its own pool of max_threads threads """
+
+    def __init__(self, wsgi_application, max_threads):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            # Startup work already happened in create_app (or lazily, with LAZY_INIT)
+            await receive()
+            await send({"type": "lifespan.startup.complete"})
+            await receive()
+            self.executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+        if scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    # The client went away before sending the whole body
+                    return
+                body.write(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            body.seek(0)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self._run, scope, body, send, loop)
+
+    def _run(self, scope, body, send, loop):
+        """ Run the WSGI app on a pool thread, handing each message back to the event loop """
+
+        def emit(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response_start.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response_start.update(
+                status=int(status.split(" ", 1)[0]),
+                headers=[(k.lower().encode("latin1"), v.encode("latin1")) for k, v in headers],
+            )
+
+        def send_start():
+            if not response_start.get("sent"):
+                response_start["sent"] = True
+                emit({
+                    "type": "http.response.start",
+                    "status": response_start["status"],
+                    "headers": response_start["headers"],
+                })
+
+        output = self.wsgi_application(build_environ(scope, body), start_response)
+        try:
+            for chunk in output:
+                if chunk:
+                    send_start()
+                    emit({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            if hasattr(output, "close"):
+                output.close()
+        send_start()
+        emit({"type": "http.response.body"})
@@ -0,0 +1,236 @@
+import os
+import select
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import Text
+
+from app.background import BackgroundWorker
+from app.extensions import db, logger, statsd
+
+
+class MemoryBus:
+    """ Delivers invalidations to subscribers in this process, for tests and single-worker runs """
+
+    healthy = True
+
+    def __init__(self):
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """ Call ``callback(assignment_id)`` for every invalidation; None means everything """
+        self._subscribers.append(callback)
+
+    def publish(self, assignment_ids):
+        for assignment_id in assignment_ids:
+            for callback in list(self._subscribers):
+                callback(assignment_id)
+
+    def ensure_listening(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PostgresBus(BackgroundWorker):
+    """ Fans invalidations out to every worker and instance with LISTEN/NOTIFY
+
+    Each process listens on its own connection, detached from the pool. While
+    that connection is down the bus reports itself unhealthy, and after every
+    (re)connect subscribers are told to drop everything, since notifications
+    sent in between were lost.
+    """
+
+    NOTIFY = text("SELECT pg_notify(:channel, id) FROM unnest(:ids) AS id").bindparams(
+        bindparam("ids", type_=ARRAY(Text))
+    )
+
+    thread_name = "assignment-cache-listener"
+    run_at_start = True
+
+    def __init__(self, engine, channel="assignment_cache", stats=None, poll_interval=5.0):
+        super().__init__(interval=poll_interval)
+        self.engine = engine
+        self.channel = channel
+        self.stats = stats
+        self._subscribers = []
+        self._connected = False
+
+    def subscribe(self, callback):
+        """ Call ``callback(assignment_id)`` for every invalidation; None means everything """
+        self._subscribers.append(callback)
+
+    @property
+    def healthy(self):
+        # A forked worker inherits the flag but not the listener thread
+        return self._connected and self._thread_pid == os.getpid()
+
+    def publish(self, assignment_ids):
+        """ Notify every listener, this process included, once the caller's write has committed """
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(self.NOTIFY, {"channel": self.channel, "ids": list(assignment_ids)})
+
+    def _deliver(self, assignment_id):
+        for callback in list(self._subscribers):
+            callback(assignment_id)
+
+    def ensure_listening(self):
+        """ Start this process's listener thread, cheaply, on first use after a fork """
+        self.ensure_running()
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        # Held for the life of the thread, so it must not count against the pool
+        connection.detach()
+        try:
+            listener = connection.driver_connection
+            listener.autocommit = True
+            with listener.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            self._connected = True
+            self._deliver(None)
+            while not self._stopping.is_set():
+                if not select.select([listener], [], [], self.interval)[0]:
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    self._deliver(listener.notifies.pop(0).payload)
+        finally:
+            self._connected = False
+            connection.close()
+
+    def run_once(self):
+        # Returns only when the connection drops; the loop reconnects after interval
+        try:
+            self._listen()
+        except Exception as e:
+            logger.error("Assignment cache listener error: %s", e)
+            if self.stats is not None:
+                self.stats.incr(".assignment_cache.listener.error")
+
+
+class AssignmentCache:
+    """ Bounded, TTL-evicted cache of live assignment rows, keyed by id
+
+    Holds plain column values, never session-bound objects. Writers call
+    invalidate() after committing; the bus carries that to every worker.
+    A load that overlaps an invalidation is not stored, so a row read just
+    before a commit cannot outlive it.
+    """
+
+    def __init__(self, stats=None, max_size=4096, ttl=30):
+        self.stats = stats
+        self.max_size = max_size
+        self.ttl = ttl
+        self.bus = MemoryBus()
+        self.bus.subscribe(self._evict)
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Read cache sizing and the invalidation bus from the app config """
+        self.bus.stop()
+        self.max_size = app.config.get("ASSIGNMENT_CACHE_MAX_SIZE", self.max_size)
+        self.ttl = app.config.get("ASSIGNMENT_CACHE_TTL", self.ttl)
+        with app.app_context():
+            engine = db.engine
+        bus = app.config.get("ASSIGNMENT_CACHE_BUS", "auto")
+        if bus == "auto":
+            bus = "postgres" if engine.dialect.name == "postgresql" else "memory"
+        if bus == "postgres":
+            self.bus = PostgresBus(
+                engine, channel=app.config.get("ASSIGNMENT_CACHE_CHANNEL", "assignment_cache"),
+                stats=self.stats,
+            )
+        else:
+            self.bus = MemoryBus()
+        self.bus.subscribe(self._evict)
+        self.clear()
+        app.extensions["assignment_cache"] = self
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def _incr(self, stat, count=1):
+        if self.stats is not None and count:
+            self.stats.incr(stat, count)
+
+    def get(self, assignment_id, load):
+        """ Return the cached row values for an assignment, calling ``load(assignment_id)`` on a miss """
+        if not self.enabled:
+            return load(assignment_id)
+        self.bus.ensure_listening()
+        if not self.bus.healthy:
+            # Without invalidations from other workers a cached row could be stale
+            self._incr(".assignment_cache.bypass")
+            return load(assignment_id)
+
+        with self._lock:
+            entry = self._entries.get(assignment_id)
+            if entry is not None:
+                values, expires_at = entry
+                if expires_at <= time.monotonic():
+                    del self._entries[assignment_id]
+                    entry = None
+                else:
+                    self._entries.move_to_end(assignment_id)
+            generation = self._generation
+
+        if entry is not None:
+            self._incr(".assignment_cache.hit")
+            return values
+
+        self._incr(".assignment_cache.miss")
+        values = load(assignment_id)
+        if values is None:
+            return None
+
+        evicted = 0
+        with self._lock:
+            if self._generation == generation:
+                self._entries[assignment_id] = (values, time.monotonic() + self.ttl)
+                self._entries.move_to_end(assignment_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    evicted += 1
+        self._incr(".assignment_cache.evict", evicted)
+        return values
+
+    def invalidate(self, *assignment_ids):
+        """ Drop assignments here and, through the bus, in every other worker """
+        if not assignment_ids:
+            return
+        for assignment_id in assignment_ids:
+            self._evict(assignment_id)
+        try:
+            self.bus.publish(assignment_ids)
+        except Exception as e:
+            # The write already committed; other workers catch up within the TTL
+            logger.error("Assignment cache invalidation failed: %s", e)
+            self._incr(".assignment_cache.publish.error")
+
+    def _evict(self, assignment_id):
+        with self._lock:
+            self._generation += 1
+            if assignment_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(assignment_id, None)
+        self._incr(".assignment_cache.invalidate")
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+assignment_cache = AssignmentCache(stats=statsd)
@@ -0,0 +1,93 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class CredentialCache:
+    """ Bounded, TTL-evicted cache of successfully verified Basic Auth credentials """
+
+    def __init__(self, stats=None, max_size=1024, ttl=300):
+        self.stats = stats
+        self.max_size = max_size
+        self.ttl = ttl
+        # Per-process key, so cache keys never reveal or depend on plaintext
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Read cache sizing from the app config """
+        self.max_size = app.config.get("AUTH_CACHE_MAX_SIZE", self.max_size)
+        self.ttl = app.config.get("AUTH_CACHE_TTL", self.ttl)
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def _cache_key(self, email, password):
+        message = f"{email}\0{password}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def _incr(self, stat, count=1):
+        if self.stats is not None and count:
+            self.stats.incr(stat, count)
+
+    def lookup(self, email, password, user):
+        """ Return True if these credentials were recently verified for this user """
+        if not self.enabled:
+            return False
+
+        key = self._cache_key(email, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                user_id, password_hash, expires_at = entry
+                if expires_at <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                    self._incr(".auth.cache.evict")
+                elif user_id != user.id or password_hash != user.password_hash:
+                    # The password changed since this entry was stored
+                    del self._entries[key]
+                    entry = None
+                    self._incr(".auth.cache.invalidate")
+                else:
+                    self._entries.move_to_end(key)
+
+        self._incr(".auth.cache.hit" if entry is not None else ".auth.cache.miss")
+        return entry is not None
+
+    def store(self, email, password, user):
+        """ Remember credentials that just passed a full bcrypt verification """
+        if not self.enabled:
+            return
+
+        key = self._cache_key(email, password)
+        expires_at = time.monotonic() + self.ttl
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (user.id, user.password_hash, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self._incr(".auth.cache.evict", evicted)
+
+    def invalidate_user(self, user_id):
+        """ Drop every cached credential belonging to a user """
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if entry[0] == user_id]
+            for key in stale:
+                del self._entries[key]
+        self._incr(".auth.cache.invalidate", len(stale))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
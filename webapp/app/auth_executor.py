@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class AuthExecutorSaturated(Exception):
+    """ Raised when the auth executor cannot accept more hashing work """
+
+
+class AuthExecutor:
+    """ Size-limited pool that runs bcrypt off the request thread with admission control
+
+    bcrypt releases the GIL while hashing, so a thread pool gives real
+    parallelism without the pickling cost of a process pool. At most
+    ``max_workers + max_queue`` operations are admitted at once; anything
+    beyond that fails fast with AuthExecutorSaturated instead of queueing.
+    """
+
+    def __init__(self, stats=None, max_workers=2, max_queue=8, timeout=None):
+        self.stats = stats
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._pool_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Read pool sizing from the app config """
+        self.max_workers = app.config.get("AUTH_EXECUTOR_WORKERS", self.max_workers)
+        self.max_queue = app.config.get("AUTH_EXECUTOR_QUEUE_DEPTH", self.max_queue)
+        self.timeout = app.config.get("AUTH_EXECUTOR_TIMEOUT", self.timeout)
+        self.shutdown()
+
+    def _ensure_pool(self):
+        # Pools do not survive a fork, so gunicorn workers each build their own
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="auth"
+                )
+                self._pool_pid = os.getpid()
+                self._slots = threading.BoundedSemaphore(
+                    self.max_workers + self.max_queue
+                )
+            return self._pool, self._slots
+
+    def _timing(self, stat, seconds):
+        if self.stats is not None:
+            self.stats.timing(stat, seconds * 1000)
+
+    def run(self, op, fn, *args):
+        """ Run a hashing function on the pool and wait for its result """
+        if self.max_workers <= 0:
+            return fn(*args)
+
+        pool, slots = self._ensure_pool()
+        if not slots.acquire(blocking=False):
+            if self.stats is not None:
+                self.stats.incr(f".auth.executor.{op}.rejected")
+            raise AuthExecutorSaturated(f"auth executor is saturated ({op})")
+
+        enqueued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            self._timing(f".auth.executor.{op}.queue_wait", started_at - enqueued_at)
+            try:
+                return fn(*args)
+            finally:
+                self._timing(
+                    f".auth.executor.{op}.hash_time", time.perf_counter() - started_at
+                )
+
+        try:
+            future = pool.submit(task)
+        except RuntimeError:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise AuthExecutorSaturated(f"auth executor timed out ({op})")
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False)
+            self._pool = None
+            self._pool_pid = None
+            self._slots = None
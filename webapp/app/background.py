@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker:
+    """ Calls run_once() on a daemon thread every interval seconds until stopped
+
+    Threads do not survive a fork, so the thread belongs to the process that
+    started it: each gunicorn worker starts its own with ensure_running(), and
+    stop() only joins a thread this process owns. wake() runs the next
+    iteration now instead of after the interval.
+    """
+
+    thread_name = "background-worker"
+    # Run once as soon as the thread starts, rather than after the first interval
+    run_at_start = False
+
+    def __init__(self, interval=60.0):
+        self.interval = interval
+        self._thread = None
+        self._thread_pid = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker_lock = threading.Lock()
+
+    def run_once(self):
+        raise NotImplementedError
+
+    @property
+    def running(self):
+        """ True when this process's thread is alive """
+        thread = self._thread
+        return thread is not None and self._thread_pid == os.getpid() and thread.is_alive()
+
+    def ensure_running(self):
+        """ Start this process's thread unless it is already running; cheap on the hot path """
+        if self.running:
+            return
+        with self._worker_lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._wakeup.clear()
+            self._thread = threading.Thread(target=self._loop, name=self.thread_name, daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _run_once_safely(self):
+        try:
+            self.run_once()
+        except Exception:
+            # run_once handles its own errors; this only keeps the thread alive
+            logger.exception("%s iteration failed", self.thread_name)
+
+    def _loop(self):
+        if self.run_at_start:
+            self._run_once_safely()
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            self._run_once_safely()
+
+    def stop(self, timeout=None):
+        """ Stop the thread, if this process started one, waiting up to timeout (default interval) """
+        with self._worker_lock:
+            thread = self._thread if self._thread_pid == os.getpid() else None
+            self._thread = None
+            self._thread_pid = None
+        if thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            thread.join(timeout=self.interval if timeout is None else timeout)
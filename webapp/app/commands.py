@@ -0,0 +1,71 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+from app.extensions import logger
+from app.idempotency import idempotency
+from app.outbox import outbox
+from app.purge import assignment_purger
+from helper_func import seed_users
+
+outbox_cli = AppGroup("outbox", help="Transactional outbox maintenance.")
+assignments_cli = AppGroup("assignments", help="Assignment maintenance.")
+idempotency_cli = AppGroup("idempotency", help="Idempotency key maintenance.")
+
+
+@outbox_cli.command("dispatch")
+@click.option("--loop", is_flag=True, help="Keep polling instead of exiting when drained.")
+def dispatch_outbox(loop):
+    """ Publish pending outbox events to SNS """
+    while True:
+        published = outbox.drain()
+        logger.info("Outbox dispatch published %s events.", published)
+        if not loop:
+            break
+        time.sleep(outbox.interval)
+
+
+@assignments_cli.command("purge")
+@click.option("--loop", is_flag=True, help="Keep purging instead of exiting when done.")
+def purge_assignments(loop):
+    """ Hard-delete soft-deleted assignments and their submissions in batches """
+    while True:
+        purged = assignment_purger.drain()
+        logger.info("Purged %s soft-deleted assignments.", purged)
+        if not loop:
+            break
+        time.sleep(assignment_purger.interval)
+
+
+@idempotency_cli.command("purge")
+def purge_idempotency_keys():
+    """ Delete expired idempotency keys in batches """
+    total = 0
+    while True:
+        purged = idempotency.purge_expired()
+        total += purged
+        if purged < idempotency.purge_batch_size:
+            break
+    logger.info("Purged %s expired idempotency keys.", total)
+
+
+@click.command("seed-users")
+@click.option("--csv", "csv_path", default=None, help="Users CSV, defaults to SEED_USERS_CSV.")
+@click.option("--processes", type=int, default=None, help="bcrypt worker processes, defaults to CPU count.")
+@click.option("--batch-size", type=int, default=500, show_default=True, help="Rows per lookup and insert.")
+@with_appcontext
+def seed_users_command(csv_path, processes, batch_size):
+    """ Bulk-load users from a CSV, skipping emails that already exist """
+    csv_path = csv_path or current_app.config.get("SEED_USERS_CSV", "login.csv")
+    added = seed_users(csv_path, processes=processes, batch_size=batch_size)
+    logger.info("Seeded %s new users from %s.", added, csv_path)
+
+
+def register_commands(app):
+    """ Attach the app's CLI command groups """
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(assignments_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(seed_users_command)
@@ -0,0 +1,66 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.extensions import statsd
+
+
+class InstrumentedQueuePool(QueuePool):
+    """ QueuePool that times how long callers wait to check out a connection """
+
+    def connect(self):
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            statsd.timing(".db.pool.checkout_wait", (time.perf_counter() - started_at) * 1000)
+
+
+def build_engine_options(config):
+    """ Translate the DB_POOL_* settings into SQLAlchemy engine options """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite needs its single shared connection
+        return {}
+
+    if config.get("DB_PGBOUNCER_MODE"):
+        # PgBouncer owns pooling; holding our own pool would pin server connections
+        return {"poolclass": NullPool, "pool_pre_ping": False}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config.get("DB_POOL_SIZE", 5),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", -1),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+    }
+
+
+def instrument_pool(engine, name="primary"):
+    """ Publish checked-out and overflow gauges from the engine's pool events """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+
+    def publish_gauges(*args):
+        statsd.gauge(f".db.pool.{name}.checked_out", pool.checkedout())
+        statsd.gauge(f".db.pool.{name}.overflow", max(pool.overflow(), 0))
+
+    event.listen(pool, "checkout", publish_gauges)
+    event.listen(pool, "checkin", publish_gauges)
+
+
+def enforce_sqlite_foreign_keys(engine):
+    """ SQLite ignores foreign keys (and ON DELETE CASCADE) unless each connection opts in """
+    if engine.dialect.name != "sqlite":
+        return
+
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    event.listen(engine, "connect", enable_foreign_keys)
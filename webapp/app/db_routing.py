@@ -0,0 +1,145 @@
+import itertools
+import logging
+import math
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.rate_limit import REDIS_ERRORS, redis
+
+REPLICA_BIND_PREFIX = "replica"
+READ_ONLY_METHODS = ("GET", "HEAD")
+PIN_COOKIE = "db_pin"
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryPinStore:
+    """ Pins held by this process only; other workers never see them """
+
+    def __init__(self):
+        self._pins = {}
+        self._lock = threading.Lock()
+
+    def pin(self, principal, seconds):
+        with self._lock:
+            now = time.monotonic()
+            self._pins[principal] = now + seconds
+            # Opportunistically forget expired pins so the map stays small
+            if len(self._pins) > 1024:
+                self._pins = {k: v for k, v in self._pins.items() if v > now}
+
+    def is_pinned(self, principal):
+        expires_at = self._pins.get(principal)
+        return expires_at is not None and expires_at > time.monotonic()
+
+
+class RedisPinStore:
+    """ Pins shared by every worker and instance, as keys that expire with the pin """
+
+    def __init__(self, client, prefix="dbpin:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        if redis is None:
+            raise RuntimeError("REPLICA_PIN_REDIS_URL requires the redis package")
+        return cls(redis.Redis.from_url(url))
+
+    def pin(self, principal, seconds):
+        try:
+            self.client.set(self.prefix + principal, 1, px=math.ceil(seconds * 1000))
+        except REDIS_ERRORS as e:
+            logger.error("Could not store replica pin: %s", e)
+
+    def is_pinned(self, principal):
+        try:
+            return bool(self.client.exists(self.prefix + principal))
+        except REDIS_ERRORS as e:
+            # Reading the primary is always correct, just more expensive
+            logger.error("Could not read replica pin, using the primary: %s", e)
+            return True
+
+
+class ReplicaRouter:
+    """ Chooses replica engines for read-only requests and pins recent writers to the primary
+
+    A write pins its principal in two places: a signed, short-lived cookie on
+    the response, which every worker can verify, and the pin store, for
+    clients that drop cookies. The store is per-process unless
+    REPLICA_PIN_REDIS_URL shares it.
+    """
+
+    def __init__(self, pin_seconds=5.0):
+        self.pin_seconds = pin_seconds
+        self.bind_keys = []
+        self.pin_store = MemoryPinStore()
+        self._serializer = None
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Discover replica binds (SQLALCHEMY_BINDS keys starting with 'replica') """
+        self.pin_seconds = app.config.get("REPLICA_PIN_SECONDS", self.pin_seconds)
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        self.bind_keys = sorted(k for k in binds if k.startswith(REPLICA_BIND_PREFIX))
+        self._cycle = itertools.cycle(self.bind_keys) if self.bind_keys else None
+        self._serializer = URLSafeTimedSerializer(app.secret_key, salt="replica-pin")
+        redis_url = app.config.get("REPLICA_PIN_REDIS_URL")
+        self.pin_store = RedisPinStore.from_url(redis_url) if redis_url else MemoryPinStore()
+
+    @property
+    def enabled(self):
+        return bool(self.bind_keys)
+
+    def pin(self, principal, response=None):
+        """ Send this principal's reads to the primary for the next pin_seconds """
+        self.pin_store.pin(principal, self.pin_seconds)
+        if response is not None:
+            response.set_cookie(
+                PIN_COOKIE, self._serializer.dumps(principal),
+                max_age=math.ceil(self.pin_seconds), httponly=True, samesite="Lax",
+            )
+
+    def _cookie_pins(self, principal, cookie):
+        if not cookie or self._serializer is None:
+            return False
+        try:
+            return self._serializer.loads(cookie, max_age=self.pin_seconds) == principal
+        except BadSignature:
+            return False
+
+    def is_pinned(self, principal, cookie=None):
+        return self._cookie_pins(principal, cookie) or self.pin_store.is_pinned(principal)
+
+    def use_replica(self, principal, cookie=None):
+        """ Route the current request's reads to one replica, unless the principal is pinned """
+        g.db_route = None
+        if self._cycle is not None and not self.is_pinned(principal, cookie):
+            with self._lock:
+                g.db_route = next(self._cycle)
+
+    def replica_engine(self, db):
+        """ The replica engine chosen for the current request, if any """
+        if not has_app_context():
+            return None
+        bind_key = g.get("db_route")
+        return db.engines[bind_key] if bind_key else None
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """ Session that reads from a replica when the request allows it, and writes to the primary """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing:
+            engine = replica_router.replica_engine(self._db)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
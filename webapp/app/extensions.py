@@ -1,40 +1,61 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
-import os, sys, logging, json
+import os, sys, logging, json, threading, atexit
 from config import Config
 from logging.handlers import RotatingFileHandler
-from statsd import StatsClient
+from app.auth_cache import CredentialCache
+from app.auth_executor import AuthExecutor
+from app.db_routing import RoutingSession
+from app.log_pipeline import AsyncLogPipeline, JsonLinesFormatter, LevelSampler, parse_sample_rates
+from app.metrics import RequestMetrics
+from app.rate_limit import RateLimiter
+from app.stats_buffer import BufferedStatsClient
 import boto3
 
 # Retrieve SNS Topic ARN from environment variable
 sns_topic_arn = Config.SNS_TOPIC_ARN
 AWS_profile_name = Config.AWS_PROFILE_NAME
-# Create an SNS client
-session = boto3.Session()
-sns_client = session.client("sns", region_name="us-east-1")
+# The SNS client is built on first use, so processes that never publish skip it
+_sns_client = None
+_sns_client_lock = threading.Lock()
 
-db = SQLAlchemy()
+
+def get_sns_client():
+    """ Return the shared SNS client, creating it on first use"""
+    global _sns_client
+    if _sns_client is None:
+        with _sns_client_lock:
+            if _sns_client is None:
+                session = boto3.Session()
+                _sns_client = session.client("sns", region_name="us-east-1")
+    return _sns_client
+
+# Reads from read-only requests can be routed to replicas, see app.db_routing
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
 
 
-# Function to publish message to SNS
-def publish_to_sns(submission_url, user_email, assignment_id, assignment_name, submission_attempt):
-    """ Publishes a message to SNS topic with submission URL and user email"""
-    sns_client.publish(
-        TopicArn=sns_topic_arn,
-        Message=json.dumps({
-            "submission_url": submission_url,
-            "email": user_email,
-            'Path': f"{user_email}/{assignment_id}/{assignment_name}/{submission_attempt + 1}",
-        }),
-    )
+# Function to build the SNS message for a submission
+def build_sns_message(submission_url, user_email, assignment_id, assignment_name, submission_attempt):
+    """ Builds the SNS message body with submission URL and user email"""
+    return json.dumps({
+        "submission_url": submission_url,
+        "email": user_email,
+        'Path': f"{user_email}/{assignment_id}/{assignment_name}/{submission_attempt + 1}",
+    })
+
 
 # Function to setup logging
 def setup_logging(level=logging.INFO):
     """ Set up logging for the application """
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    global log_pipeline
+    if Config.LOG_FORMAT == "json":
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+    handlers = []
 
     # Set up the root logger
     root_logger = logging.getLogger()
@@ -44,7 +65,7 @@ def setup_logging(level=logging.INFO):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(level)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     # For non-Windows environments, attempt to set up file logging
     if not sys.platform.startswith("win"):
@@ -66,7 +87,7 @@ def setup_logging(level=logging.INFO):
             )
             info_handler.setLevel(logging.INFO)
             info_handler.setFormatter(formatter)
-            root_logger.addHandler(info_handler)
+            handlers.append(info_handler)
 
             error_log_path = os.path.join(log_directory, error_log_file)
             error_handler = RotatingFileHandler(
@@ -74,22 +95,43 @@ def setup_logging(level=logging.INFO):
             )
             error_handler.setLevel(logging.ERROR)
             error_handler.setFormatter(formatter)
-            root_logger.addHandler(error_handler)
+            handlers.append(error_handler)
 
         except PermissionError as e:
             print(f"Failed to create log directory '{log_directory}'. {e}")
         except OSError as e:
             print(f"Failed to create log directory '{log_directory}'. {e}")
 
+    sampler = LevelSampler(parse_sample_rates(Config.LOG_SAMPLE_RATES))
+    if Config.LOG_ASYNC:
+        # Request threads only enqueue; the listener thread formats and writes
+        log_pipeline = AsyncLogPipeline(handlers, maxsize=Config.LOG_QUEUE_SIZE)
+        log_pipeline.queue_handler.addFilter(sampler)
+        root_logger.addHandler(log_pipeline.queue_handler)
+        log_pipeline.start()
+        atexit.register(log_pipeline.stop)
+    else:
+        for handler in handlers:
+            handler.addFilter(sampler)
+            root_logger.addHandler(handler)
+
     return root_logger
 
 
 # Initialize the logger
+log_pipeline = None  # Set when LOG_ASYNC queues records for a listener thread
 logger = setup_logging()
 if logger:
     logger.info("Logging setup complete.")
 else:
     print("Failed to setup file-based logging, falling back to console logging.")
 
-statsd = StatsClient(host="localhost", port=8125, prefix="webapp")
+# Metrics emitted during a request are sent as one pipeline at teardown, see app.stats_buffer
+statsd = BufferedStatsClient(host="localhost", port=8125, prefix="webapp")
+if log_pipeline is not None:
+    log_pipeline.queue_handler.stats = statsd
+credential_cache = CredentialCache(stats=statsd)
+auth_executor = AuthExecutor(stats=statsd)
+request_metrics = RequestMetrics(stats=statsd)
+rate_limiter = RateLimiter(stats=statsd)
 # End-of-file (EOF)
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db, logger
+
+
+class ReadinessProbe:
+    """ Database readiness check whose SELECT 1 result is cached between probes
+
+    Pool saturation is only reported by default: a busy instance pulled out
+    of the load balancer shifts its traffic onto the others, which saturate
+    in turn. fail_on_saturation opts in to failing the probe.
+    """
+
+    def __init__(self, interval=5.0, saturation_threshold=1.0, fail_on_saturation=False):
+        self.interval = interval
+        self.saturation_threshold = saturation_threshold
+        self.fail_on_saturation = fail_on_saturation
+        self._checked_at = None
+        self._database_ok = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """ Read the cache interval and saturation threshold from the app config """
+        self.interval = app.config.get("READINESS_CACHE_SECONDS", self.interval)
+        self.saturation_threshold = app.config.get(
+            "READINESS_POOL_SATURATION", self.saturation_threshold
+        )
+        self.fail_on_saturation = app.config.get(
+            "READINESS_FAIL_ON_SATURATION", self.fail_on_saturation
+        )
+        self._checked_at = None
+
+    def ping(self):
+        """ Run SELECT 1 on a connection that goes straight back to the pool """
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError as e:
+            logger.error("Database readiness probe failed: %s", e)
+            return False
+
+    def database_ok(self):
+        """ Cached ping result; only one caller refreshes it when it goes stale """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.interval:
+            return self._database_ok
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.interval:
+                self._database_ok = self.ping()
+                self._checked_at = time.monotonic()
+            return self._database_ok
+
+    def pool_status(self):
+        """ Checked-out connections against the pool's capacity, without any I/O """
+        pool = db.engine.pool
+        if not hasattr(pool, "checkedout"):
+            # NullPool and friends have no fixed capacity to saturate
+            return {"checked_out": None, "capacity": None, "saturation": 0.0}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        return {
+            "checked_out": checked_out,
+            "capacity": capacity,
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        }
+
+    def check(self):
+        """ Return (ready, details) for the readiness endpoint """
+        database_ok = self.database_ok()
+        pool = self.pool_status()
+        saturated = pool["saturation"] >= self.saturation_threshold
+        details = {
+            "database": "ok" if database_ok else "unavailable",
+            "pool": dict(pool, saturated=saturated),
+        }
+        return database_ok and not (saturated and self.fail_on_saturation), details
+
+
+readiness_probe = ReadinessProbe()
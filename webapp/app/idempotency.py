@@ -0,0 +1,278 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, abort, g, make_response, request
+from sqlalchemy import delete, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, logger, statsd
+from app.models import IdempotencyKey
+from helper_func import set_default_headers
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# Returned by _claim when this request now owns the key
+CLAIMED = object()
+
+
+class IdempotencyStore:
+    """ Runs a POST handler at most once per (user, Idempotency-Key) and replays its response
+
+    The key's row is the cross-worker lock: it is inserted before the handler
+    runs and filled in with the response afterwards. Duplicates in the same
+    worker queue behind an in-process lock instead of polling; duplicates in
+    other workers poll the row until it is filled in or wait_timeout passes.
+    Handlers that write finish with commit_response(), which stores the
+    response in the same transaction as their writes, so a crash can never
+    leave the writes committed under a key that a retry would take over.
+    Aborts, errors and 5xx release the key so a retry runs the handler again.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.enabled = True
+        self.ttl = 86400
+        self.wait_timeout = 10.0
+        self.lock_timeout = 60.0
+        self.poll_interval = 0.05
+        self.purge_interval = 300.0
+        self.purge_batch_size = 1000
+        self._next_purge = 0.0
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def init_app(self, app):
+        """ Read key lifetimes and waits from the app config """
+        self.enabled = app.config.get("IDEMPOTENCY_ENABLED", self.enabled)
+        self.ttl = app.config.get("IDEMPOTENCY_TTL", self.ttl)
+        self.wait_timeout = app.config.get("IDEMPOTENCY_WAIT_TIMEOUT", self.wait_timeout)
+        self.lock_timeout = app.config.get("IDEMPOTENCY_LOCK_TIMEOUT", self.lock_timeout)
+        self.purge_interval = app.config.get("IDEMPOTENCY_PURGE_INTERVAL", self.purge_interval)
+        self._next_purge = 0.0
+        app.extensions["idempotency"] = self
+
+    def _incr(self, stat, count=1):
+        if self.stats is not None and count:
+            self.stats.incr(stat, count)
+
+    @contextmanager
+    def _local_lock(self, scope):
+        with self._guard:
+            entry = self._locks.setdefault(scope, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(timeout=self.wait_timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[scope]
+
+    def _claim(self, user_id, key, request_hash):
+        """ Take the key for this request, returning CLAIMED, else the holder's row or None if it just went """
+        now = datetime.utcnow()
+        claim = {
+            "request_hash": request_hash,
+            "status_code": None,
+            "content_type": None,
+            "response_body": None,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl),
+            "locked_until": now + timedelta(seconds=self.lock_timeout),
+        }
+        try:
+            db.session.execute(insert(IdempotencyKey).values(user_id=user_id, key=key, **claim))
+            db.session.commit()
+            g.idempotency_claim = (user_id, key, claim["locked_until"])
+            return CLAIMED
+        except IntegrityError:
+            db.session.rollback()
+
+        # An expired key is free to reuse, and so is one whose worker died mid-request
+        taken_over = db.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    (IdempotencyKey.status_code.is_(None))
+                    & (IdempotencyKey.locked_until <= now)
+                    & (IdempotencyKey.request_hash == request_hash),
+                ),
+            )
+            .values(**claim),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.session.commit()
+        if taken_over:
+            g.idempotency_claim = (user_id, key, claim["locked_until"])
+            return CLAIMED
+
+        row = db.session.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.content_type,
+                IdempotencyKey.response_body,
+            ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).first()
+        db.session.rollback()
+        return row
+
+    def _release(self, user_id, key):
+        db.session.rollback()
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+
+    def _record(self, response):
+        """ Add the response to the current transaction, unless this request no longer holds the key """
+        user_id, key, locked_until = g.pop("idempotency_claim")
+        recorded = db.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+                IdempotencyKey.locked_until == locked_until,
+            )
+            .values(
+                status_code=response.status_code,
+                content_type=response.content_type if response.get_data() else None,
+                response_body=response.get_data(),
+            ),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        if not recorded:
+            # Outlived lock_timeout and another request took the key over; its writes win
+            db.session.rollback()
+            self._incr(".idempotency.conflict")
+            abort(409, description=f"A request with this {HEADER} is still in progress")
+        self._incr(".idempotency.stored")
+
+    def commit_response(self, build):
+        """ Flush, build the response with ``build()``, and commit it with the handler's writes """
+        db.session.flush()
+        response = make_response(build())
+        if g.get("idempotency_claim") is not None and response.status_code < 500:
+            self._record(response)
+        db.session.commit()
+        return response
+
+    def _execute(self, user_id, key, view, args, kwargs):
+        try:
+            response = make_response(view(*args, **kwargs))
+        except BaseException:
+            if g.pop("idempotency_claim", None) is not None:
+                self._release(user_id, key)
+            raise
+        if g.get("idempotency_claim") is None:
+            # Already recorded by commit_response
+            return response
+        if response.status_code >= 500:
+            g.pop("idempotency_claim")
+            self._release(user_id, key)
+        else:
+            # A handler that wrote nothing has no transaction to share
+            self._record(response)
+            db.session.commit()
+        return response
+
+    def _replay(self, row):
+        self._incr(".idempotency.replayed")
+        response = Response(row.response_body or b"", status=row.status_code)
+        if row.content_type:
+            response.headers["Content-Type"] = row.content_type
+        response.headers["Idempotent-Replayed"] = "true"
+        return set_default_headers(response)
+
+    def handle(self, key, view, args, kwargs):
+        """ Run ``view`` for the current user under an Idempotency-Key, or replay its response """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            abort(400, description=f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters")
+        user_id = g.current_user.id
+        request_hash = hashlib.sha256(
+            b"\0".join([request.method.encode(), request.path.encode(), request.get_data()])
+        ).hexdigest()
+        self._purge_if_due()
+
+        with self._local_lock((user_id, key)) as acquired:
+            deadline = time.monotonic() + self.wait_timeout
+            while acquired:
+                row = self._claim(user_id, key, request_hash)
+                if row is CLAIMED:
+                    return self._execute(user_id, key, view, args, kwargs)
+                if row is None:
+                    # Released by a failed first attempt; claim it again
+                    continue
+                if row.request_hash != request_hash:
+                    self._incr(".idempotency.mismatch")
+                    abort(422, description=f"{HEADER} was already used for a different request")
+                if row.status_code is not None:
+                    return self._replay(row)
+                if time.monotonic() >= deadline:
+                    break
+                # Another worker holds the key; wait for its response
+                time.sleep(self.poll_interval)
+
+        self._incr(".idempotency.conflict")
+        abort(409, description=f"A request with this {HEADER} is still in progress")
+
+    def purge_expired(self):
+        """ Delete one batch of expired keys, returning how many went """
+        batch = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= datetime.utcnow())
+            .limit(self.purge_batch_size)
+        )
+        purged = db.session.execute(
+            delete(IdempotencyKey).where(
+                tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(batch)
+            ),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.session.commit()
+        self._incr(".idempotency.purged", purged)
+        return purged
+
+    def _purge_if_due(self):
+        # At most one batch per worker per interval, so the table stays bounded without a job
+        now = time.monotonic()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        try:
+            self.purge_expired()
+        except Exception as e:
+            logger.error("Idempotency key purge error: %s", e)
+            db.session.rollback()
+
+
+idempotency = IdempotencyStore(stats=statsd)
+
+
+def idempotent(view):
+    """ Honor an Idempotency-Key header on a view; apply under basic_auth_required """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None or not idempotency.enabled:
+            return view(*args, **kwargs)
+        return idempotency.handle(key, view, args, kwargs)
+
+    return wrapper
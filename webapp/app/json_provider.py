@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+
+def _default(obj):
+    """ Encode types the stdlib json module does not know about """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """ JSON provider that uses orjson when it is installed and the stdlib otherwise
+
+    Datetimes are encoded as ISO 8601 in both cases, matching the models'
+    serialize() output rather than Flask's HTTP-date default.
+    """
+
+    default = staticmethod(_default)
+
+    @property
+    def uses_orjson(self):
+        return orjson is not None
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        """ Serialize to UTF-8 bytes, skipping the str round trip when orjson is available """
+        if orjson is not None:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+        return super().dumps(obj, **kwargs).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def dumps_rows(self, columns, rows):
+        """ Column-projection fast path: encode (column, ...) row tuples as a list of objects """
+        return self.dumps_bytes([dict(zip(columns, row)) for row in rows])
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ One JSON object per line, for log shippers that parse structured records """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def parse_sample_rates(spec):
+    """ Parse "INFO=0.1,DEBUG=0" into {levelno: rate} """
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        level, rate = item.split("=", 1)
+        levelno = logging.getLevelName(level.strip().upper())
+        if isinstance(levelno, int):
+            rates[levelno] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class LevelSampler(logging.Filter):
+    """ Keep a fraction of records per level; levels without a rate are always kept """
+
+    def __init__(self, rates, rng=random.random):
+        super().__init__()
+        self.rates = rates
+        self.rng = rng
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or rate >= 1.0 or self.rng() < rate
+
+
+class BoundedQueueHandler(QueueHandler):
+    """ QueueHandler that drops (and counts) records instead of blocking when the queue is full """
+
+    def __init__(self, maxsize=10000, stats=None):
+        super().__init__(queue.Queue(maxsize))
+        self.stats = stats
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            if self.stats is not None:
+                self.stats.incr(".logging.dropped")
+
+
+class AsyncLogPipeline:
+    """ Request threads only enqueue; a listener thread does the formatting and file I/O """
+
+    def __init__(self, handlers, maxsize=10000):
+        self.maxsize = maxsize
+        self.queue_handler = BoundedQueueHandler(maxsize)
+        self.listener = QueueListener(
+            self.queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        if hasattr(os, "register_at_fork"):
+            # Forked workers inherit the queue but not the listener thread
+            os.register_at_fork(after_in_child=self._restart_in_child)
+
+    def start(self):
+        self.listener.start()
+
+    def stop(self):
+        """ Flush everything still queued, then stop the listener thread """
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def _restart_in_child(self):
+        if self.listener._thread is None:
+            return
+        # A fresh queue: the parent still owns (and will write) whatever it had queued
+        self.queue_handler.queue = self.listener.queue = queue.Queue(self.maxsize)
+        self.listener._thread = None
+        self.listener.start()
@@ -0,0 +1,69 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+
+class RequestMetrics:
+    """ Per-route latency timers plus a per-stage breakdown, published through statsd
+
+    Stages may overlap (the auth lookup is counted in both "auth" and "db"),
+    so they explain where time goes rather than summing to the total.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+
+    def init_app(self, app):
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def instrument_engine(self, engine):
+        """ Attribute time spent executing SQL to the "db" stage """
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @contextmanager
+    def stage(self, name):
+        """ Time a block as a named stage of the current request """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, (time.perf_counter() - started_at) * 1000)
+
+    def record_stage(self, name, ms, standalone=True):
+        stages = g.get("metrics_stages") if has_request_context() else None
+        if stages is not None:
+            stages[name] += ms
+        elif standalone and self.stats is not None:
+            # Outside a request (CLI, background threads) the stage stands alone
+            self.stats.timing(f".stage.{name}", ms)
+
+    def _start_request(self):
+        g.metrics_started_at = time.perf_counter()
+        g.metrics_stages = defaultdict(float)
+
+    def _finish_request(self, response):
+        started_at = g.get("metrics_started_at")
+        if started_at is None or self.stats is None:
+            return response
+        # Streamed bodies are still being produced here, so this is time to first byte
+        elapsed = (time.perf_counter() - started_at) * 1000
+        endpoint = request.endpoint or "unmatched"
+        self.stats.timing(f".route.{endpoint}", elapsed)
+        self.stats.timing(f".route.{endpoint}.{response.status_code}", elapsed)
+        for name, ms in g.metrics_stages.items():
+            self.stats.timing(f".route.{endpoint}.stage.{name}", ms)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("metrics_query_start")
+        if started:
+            # Per-statement timers would be too chatty outside a request
+            self.record_stage("db", (time.perf_counter() - started.pop()) * 1000, standalone=False)
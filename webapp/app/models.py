@@ -1,5 +1,9 @@
-from app.extensions import db, bcrypt
+from app.extensions import db, bcrypt, credential_cache, auth_executor
+from app.assignment_cache import assignment_cache
 from datetime import datetime
+import hashlib
+from flask import abort
+from sqlalchemy import event, func, select, text
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -17,18 +21,71 @@ class User(db.Model):
     
     @password.setter
     def password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        password_hash = auth_executor.run('hash', bcrypt.generate_password_hash, password)
+        self.password_hash = password_hash.decode('utf-8')
 
     def verify_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return auth_executor.run('verify', bcrypt.check_password_hash, self.password_hash, password)
+
+
+@event.listens_for(User.password_hash, 'set')
+def invalidate_cached_credentials(target, value, oldvalue, initiator):
+    """ Evict cached credentials as soon as a user's password hash changes"""
+    if target.id is not None and value != oldvalue:
+        credential_cache.invalidate_user(target.id)
+
 
 class Submission(db.Model):
+    # The per-user attempt count, then keyset pagination on (submission_date, id) per assignment and per user
+    __table_args__ = (
+        db.Index('ix_submission_assignment_id_user_id', 'assignment_id', 'user_id'),
+        db.Index('ix_submission_assignment_id_date_id', 'assignment_id', 'submission_date', 'id'),
+        db.Index('ix_submission_user_id_date_id', 'user_id', 'submission_date', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    assignment_id = db.Column(db.String, db.ForeignKey('assignment.id'), nullable=False)    
+    # The database removes submissions with their assignment
+    assignment_id = db.Column(
+        db.String, db.ForeignKey('assignment.id', ondelete='CASCADE'), nullable=False
+    )
+    # Nullable because submissions made before owners were recorded have none
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     submission_url = db.Column(db.String(200), nullable=False)
     submission_date = db.Column(db.DateTime, default=datetime.utcnow)
     assignment_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Fields returned by serialize(), in order, for column-projection queries
+    SERIALIZED_COLUMNS = (
+        'id', 'assignment_id', 'submission_url', 'submission_date', 'assignment_updated',
+    )
+
+    @classmethod
+    def projection(cls):
+        """ Columns to select instead of full objects when only serialized data is needed"""
+        return [getattr(cls, column) for column in cls.SERIALIZED_COLUMNS]
+
+    @classmethod
+    def lock_attempts(cls, assignment_id, user_id):
+        """ Serialize concurrent submissions by one user to one assignment until commit"""
+        if db.session.get_bind().dialect.name == 'postgresql':
+            db.session.execute(
+                text('SELECT pg_advisory_xact_lock(hashtext(:assignment_id), :user_id)'),
+                {'assignment_id': assignment_id, 'user_id': user_id},
+            )
+        else:
+            db.session.execute(
+                select(Assignment.id).where(Assignment.id == assignment_id).with_for_update()
+            )
+
+    @classmethod
+    def count_attempts(cls, assignment_id, user_id):
+        """ Number of submissions a user has made for an assignment"""
+        return db.session.scalar(
+            select(func.count(cls.id)).where(
+                cls.assignment_id == assignment_id, cls.user_id == user_id
+            )
+        )
+
     def serialize(self):
         """ Return object data in easily serializable format"""
         return {
@@ -44,6 +101,19 @@ class Submission(db.Model):
 
 
 class Assignment(db.Model):
+    # Keyset pagination on (assignment_created, id) over live rows, and the purge's scan
+    __table_args__ = (
+        db.Index(
+            'ix_assignment_live_created_id', 'assignment_created', 'id',
+            postgresql_where=text('deleted_at IS NULL'), sqlite_where=text('deleted_at IS NULL'),
+        ),
+        db.Index(
+            'ix_assignment_deleted_at', 'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+            sqlite_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
+
     id = db.Column(db.String, primary_key=True)  # UUID as string
     name = db.Column(db.String(50), nullable=False)
     points = db.Column(db.Integer, nullable=False)
@@ -51,10 +121,54 @@ class Assignment(db.Model):
     deadline = db.Column(db.DateTime, nullable=False)
     assignment_created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     assignment_updated = db.Column(db.DateTime, nullable=True, onupdate=datetime.utcnow)
+    # Bumped on every write, used as the ETag validator
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Set by a soft delete; the purge job removes the row and its submissions later
+    deleted_at = db.Column(db.DateTime, nullable=True)
 
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     creator = db.relationship('User', backref='assignments')
 
+    # Fields returned by serialize(), in order, for column-projection queries
+    SERIALIZED_COLUMNS = (
+        'id', 'name', 'points', 'num_of_attempts', 'deadline',
+        'assignment_created', 'assignment_updated',
+    )
+
+    @classmethod
+    def is_live(cls):
+        """ Predicate matching the partial indexes, for every read of assignments"""
+        return cls.deleted_at.is_(None)
+
+    @classmethod
+    def get_live_or_404(cls, assignment_id):
+        """ Like get_or_404, treating soft-deleted assignments as gone"""
+        return cls.query.filter(cls.id == assignment_id, cls.is_live()).first_or_404()
+
+    @classmethod
+    def load_live_row(cls, assignment_id):
+        """ Column values of a live assignment, or None; reads the primary so a lagging replica is never cached"""
+        row = db.session.execute(
+            select(*cls.__table__.columns).where(cls.id == assignment_id, cls.is_live()),
+            bind_arguments={"bind": db.engine},
+        ).first()
+        return row._asdict() if row is not None else None
+
+    @classmethod
+    def get_cached_or_404(cls, assignment_id):
+        """ Like get_live_or_404 through the assignment cache; the result is detached, for reading only"""
+        if not assignment_cache.enabled:
+            return cls.get_live_or_404(assignment_id)
+        values = assignment_cache.get(assignment_id, cls.load_live_row)
+        if values is None:
+            abort(404)
+        return cls(**values)
+
+    @classmethod
+    def projection(cls):
+        """ Columns to select instead of full objects when only serialized data is needed"""
+        return [getattr(cls, column) for column in cls.SERIALIZED_COLUMNS]
+
     def serialize(self):
         """ Return object data in easily serializable format"""
         return {
@@ -66,3 +180,61 @@ class Assignment(db.Model):
             'assignment_created': self.assignment_created.isoformat(),
             'assignment_updated': self.assignment_updated.isoformat() if self.assignment_updated else None
             }
+
+    @property
+    def etag(self):
+        """ Validator that changes whenever this assignment is modified"""
+        return f'{self.id}-{self.version}'
+
+    @classmethod
+    def collection_etag(cls, variant=''):
+        """ Aggregate validator for the assignment list, computed without fetching rows"""
+        count, max_created, max_updated, versions = db.session.execute(
+            select(
+                func.count(cls.id),
+                func.max(cls.assignment_created),
+                func.max(cls.assignment_updated),
+                func.coalesce(func.sum(cls.version), 0),
+            ).where(cls.is_live())
+        ).one()
+        state = f'{count}|{max_created}|{max_updated}|{versions}|{variant}'
+        return hashlib.sha1(state.encode('utf-8')).hexdigest()
+
+
+class OutboxEvent(db.Model):
+    """ Message waiting to be published, written in the same transaction as its source row"""
+    __tablename__ = 'outbox_event'
+    __table_args__ = (
+        db.Index('ix_outbox_event_next_attempt_at', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic_arn = db.Column(db.String(256), nullable=True)
+    payload = db.Column(db.Text, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Null once the event has exhausted its retries and is parked for inspection
+    next_attempt_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    last_error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class IdempotencyKey(db.Model):
+    """ First response to a request sent with an Idempotency-Key, replayed to its retries until it expires"""
+    __tablename__ = 'idempotency_key'
+    __table_args__ = (
+        db.Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
+
+    # Keys are scoped to the caller, so clients cannot collide with or replay each other
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    # Method, path and body of the first request; a reuse with anything else is rejected
+    request_hash = db.Column(db.String(64), nullable=False)
+    # Null while the first request is still running
+    status_code = db.Column(db.Integer, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    response_body = db.Column(db.LargeBinary, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    # A claim still unfinished after this is treated as abandoned by a crashed worker
+    locked_until = db.Column(db.DateTime, nullable=False)
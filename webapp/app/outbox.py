@@ -0,0 +1,194 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.background import BackgroundWorker
+from app.extensions import (
+    db,
+    get_sns_client,
+    logger,
+    request_metrics,
+    sns_topic_arn,
+    statsd,
+)
+from app.models import OutboxEvent
+
+# SNS PublishBatch accepts at most ten entries per call
+SNS_BATCH_LIMIT = 10
+
+
+class SnsTransport:
+    """ Publishes outbox batches with SNS PublishBatch """
+
+    def __init__(self, client=None):
+        self.client = client
+
+    def publish_batch(self, topic_arn, entries):
+        """ Publish (id, message) pairs, returning the ids SNS rejected """
+        client = self.client or get_sns_client()
+        response = client.publish_batch(
+            TopicArn=topic_arn,
+            PublishBatchRequestEntries=[
+                {"Id": str(event_id), "Message": message} for event_id, message in entries
+            ],
+        )
+        return {int(failed["Id"]) for failed in response.get("Failed", [])}
+
+
+class InMemoryTransport:
+    """ Records published batches in memory, for tests and local runs """
+
+    def __init__(self):
+        self.published = []
+        self.failures = []
+
+    def fail_next(self, *exceptions):
+        """ Raise these exceptions from the next publish calls, in order """
+        self.failures.extend(exceptions)
+
+    def publish_batch(self, topic_arn, entries):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.published.extend((topic_arn, message) for _, message in entries)
+        return set()
+
+    @property
+    def messages(self):
+        return [message for _, message in self.published]
+
+
+TRANSPORTS = {"sns": SnsTransport, "memory": InMemoryTransport}
+
+
+class OutboxDispatcher(BackgroundWorker):
+    """ Drains the transactional outbox in batches on a background thread or from the CLI """
+
+    thread_name = "outbox-dispatcher"
+
+    def __init__(self, stats=None):
+        super().__init__(interval=5.0)
+        self.stats = stats
+        self.transport = None
+        self.batch_size = 100
+        self.max_attempts = 8
+        self.backoff_base = 1.0
+        self.backoff_max = 300.0
+        self.enabled = True
+        self._app = None
+
+    def init_app(self, app):
+        """ Configure the dispatcher from the app config """
+        self.stop()
+        self._app = app
+        self.transport = TRANSPORTS[app.config.get("OUTBOX_TRANSPORT", "sns")]()
+        self.batch_size = app.config.get("OUTBOX_BATCH_SIZE", self.batch_size)
+        self.max_attempts = app.config.get("OUTBOX_MAX_ATTEMPTS", self.max_attempts)
+        self.backoff_base = app.config.get("OUTBOX_BACKOFF_BASE", self.backoff_base)
+        self.backoff_max = app.config.get("OUTBOX_BACKOFF_MAX", self.backoff_max)
+        self.interval = app.config.get("OUTBOX_POLL_INTERVAL", self.interval)
+        self.enabled = app.config.get("OUTBOX_DISPATCHER_ENABLED", self.enabled)
+        app.extensions["outbox"] = self
+
+    def start(self):
+        """ Start the background thread once the outbox table is known to exist """
+        if self.enabled:
+            self.ensure_running()
+
+    def enqueue(self, message, topic_arn=None):
+        """ Add a message to the current transaction; it is published after commit """
+        event = OutboxEvent(topic_arn=topic_arn or sns_topic_arn, payload=message)
+        db.session.add(event)
+        return event
+
+    def wake(self):
+        """ Ask the background thread to drain now instead of at the next poll """
+        if self.enabled:
+            self.ensure_running()
+            super().wake()
+
+    def _incr(self, stat, count=1):
+        if self.stats is not None and count:
+            self.stats.incr(stat, count)
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        # Jitter so events that failed together do not retry together
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    def dispatch_once(self):
+        """ Publish one batch of due events, returning how many were published """
+        now = datetime.utcnow()
+        events = db.session.scalars(
+            select(OutboxEvent)
+            .where(OutboxEvent.next_attempt_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not events:
+            db.session.rollback()
+            return 0
+
+        published, failed = [], []
+        by_topic = {}
+        for event in events:
+            by_topic.setdefault(event.topic_arn, []).append(event)
+
+        for topic_arn, topic_events in by_topic.items():
+            for start in range(0, len(topic_events), SNS_BATCH_LIMIT):
+                batch = topic_events[start:start + SNS_BATCH_LIMIT]
+                try:
+                    with request_metrics.stage("sns"):
+                        rejected = self.transport.publish_batch(
+                            topic_arn, [(event.id, event.payload) for event in batch]
+                        )
+                    error = "rejected by SNS"
+                except Exception as e:
+                    logger.error("Outbox publish failed: %s", e)
+                    rejected = {event.id for event in batch}
+                    error = str(e)[:500]
+                for event in batch:
+                    if event.id in rejected:
+                        event.last_error = error
+                        failed.append(event)
+                    else:
+                        published.append(event)
+
+        for event in published:
+            db.session.delete(event)
+        for event in failed:
+            event.attempts += 1
+            if event.attempts >= self.max_attempts:
+                event.next_attempt_at = None
+                logger.error("Outbox event %s parked after %s attempts.", event.id, event.attempts)
+                self._incr(".outbox.parked")
+            else:
+                event.next_attempt_at = now + self._backoff(event.attempts)
+        db.session.commit()
+
+        self._incr(".outbox.published", len(published))
+        self._incr(".outbox.failed", len(failed))
+        return len(published)
+
+    def drain(self):
+        """ Publish batches until no due events remain or a whole batch fails """
+        total = 0
+        while True:
+            published = self.dispatch_once()
+            total += published
+            if published < self.batch_size:
+                return total
+
+    def run_once(self):
+        with self._app.app_context():
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error("Outbox dispatcher error: %s", e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+
+outbox = OutboxDispatcher(stats=statsd)
@@ -0,0 +1,111 @@
+from sqlalchemy import delete, select
+
+from app.background import BackgroundWorker
+from app.extensions import db, logger, statsd
+from app.models import Assignment, Submission
+
+
+class AssignmentPurger(BackgroundWorker):
+    """ Hard-deletes soft-deleted assignments, removing their submissions in bounded batches
+
+    Each batch commits on its own, so no single transaction holds locks on
+    thousands of submission rows. Every step is idempotent, so two workers
+    purging the same assignment only repeat work.
+    """
+
+    thread_name = "assignment-purger"
+
+    def __init__(self, stats=None):
+        super().__init__(interval=60.0)
+        self.stats = stats
+        self.batch_size = 1000
+        self.assignments_per_run = 50
+        self.enabled = True
+        self._app = None
+
+    def init_app(self, app):
+        """ Configure the purger from the app config """
+        self.stop()
+        self._app = app
+        self.batch_size = app.config.get("PURGE_BATCH_SIZE", self.batch_size)
+        self.assignments_per_run = app.config.get(
+            "PURGE_ASSIGNMENTS_PER_RUN", self.assignments_per_run
+        )
+        self.interval = app.config.get("PURGE_INTERVAL", self.interval)
+        self.enabled = app.config.get("PURGE_ENABLED", self.enabled) and app.config.get(
+            "ASSIGNMENTS_SOFT_DELETE", True
+        )
+        app.extensions["assignment_purger"] = self
+
+    def start(self):
+        """ Start the background thread once the schema is known to exist """
+        if self.enabled:
+            self.ensure_running()
+
+    def _incr(self, stat, count=1):
+        if self.stats is not None and count:
+            self.stats.incr(stat, count)
+
+    def purge_submissions(self, assignment_id):
+        """ Delete one batch of an assignment's submissions, returning how many went """
+        batch = (
+            select(Submission.id)
+            .where(Submission.assignment_id == assignment_id)
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        deleted = db.session.execute(
+            delete(Submission).where(Submission.id.in_(batch)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.session.commit()
+        self._incr(".purge.submissions", deleted)
+        return deleted
+
+    def purge_once(self):
+        """ Purge up to assignments_per_run soft-deleted assignments, returning how many went """
+        assignment_ids = db.session.scalars(
+            select(Assignment.id)
+            .where(Assignment.deleted_at.is_not(None))
+            .order_by(Assignment.deleted_at)
+            .limit(self.assignments_per_run)
+        ).all()
+        db.session.rollback()
+
+        for assignment_id in assignment_ids:
+            while self.purge_submissions(assignment_id) >= self.batch_size:
+                pass
+            # Guarded on deleted_at, so a row that was never soft-deleted is never removed
+            db.session.execute(
+                delete(Assignment).where(
+                    Assignment.id == assignment_id, Assignment.deleted_at.is_not(None)
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            db.session.commit()
+        self._incr(".purge.assignments", len(assignment_ids))
+        return len(assignment_ids)
+
+    def drain(self):
+        """ Purge until no soft-deleted assignments remain """
+        total = 0
+        while True:
+            purged = self.purge_once()
+            total += purged
+            if purged < self.assignments_per_run:
+                return total
+
+    def run_once(self):
+        with self._app.app_context():
+            try:
+                purged = self.drain()
+                if purged:
+                    logger.info("Purged %s soft-deleted assignments.", purged)
+            except Exception as e:
+                logger.error("Assignment purge error: %s", e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+
+assignment_purger = AssignmentPurger(stats=statsd)
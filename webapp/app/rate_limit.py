@@ -0,0 +1,276 @@
+import logging
+import math
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - exercised when redis is not installed
+    redis = None
+
+# Socket errors can escape redis-py's own wrapping during connection setup
+REDIS_ERRORS = (redis.RedisError, OSError) if redis is not None else (OSError,)
+
+# app.extensions imports this module, so log through the root handlers it installs
+logger = logging.getLogger(__name__)
+
+
+class BackendUnavailable(Exception):
+    """ Raised by a backend that cannot reach its store """
+
+
+class RateLimited(Exception):
+    """ Raised when a caller is over its limit or backing off after failed logins """
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f"rate limited ({scope})")
+        self.scope = scope
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class MemoryBackend:
+    """ Per-process token buckets and failure counters; limits are per gunicorn worker
+
+    Keys that can no longer affect a decision (full buckets, expired counters
+    and locks) are swept every ``sweep_interval`` seconds, so clients sending
+    ever-new emails cannot grow the maps without bound.
+    """
+
+    def __init__(self, clock=time.monotonic, sweep_interval=60.0):
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self._buckets = {}
+        self._counters = {}
+        self._locks = {}
+        self._next_sweep = clock() + sweep_interval
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        # Called with self._lock held
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+        for key in [k for k, (_, expires_at) in self._counters.items() if expires_at <= now]:
+            del self._counters[key]
+        for key in [k for k, expires_at in self._locks.items() if expires_at <= now]:
+            del self._locks[key]
+
+    def take(self, key, limit, period):
+        """ Take one token from a bucket of ``limit`` tokens refilled over ``period``; return seconds to wait """
+        rate = limit / period
+        with self._lock:
+            now = self.clock()
+            self._sweep(now)
+            tokens, updated_at, _ = self._buckets.get(key, (limit, now, now))
+            tokens = min(limit, tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / rate
+            # Once full again the bucket is indistinguishable from a missing one
+            self._buckets[key] = (tokens, now, now + (limit - tokens) / rate)
+            return wait
+
+    def incr(self, key, ttl):
+        with self._lock:
+            now = self.clock()
+            self._sweep(now)
+            count, expires_at = self._counters.get(key, (0, now + ttl))
+            if expires_at <= now:
+                count, expires_at = 0, now + ttl
+            self._counters[key] = (count + 1, expires_at)
+            return count + 1
+
+    def lock(self, key, ttl):
+        with self._lock:
+            now = self.clock()
+            self._sweep(now)
+            self._locks[key] = now + ttl
+
+    def lock_ttl(self, key):
+        """ Seconds left on a lock, 0 when there is none """
+        expires_at = self._locks.get(key)
+        if expires_at is None:
+            return 0
+        remaining = expires_at - self.clock()
+        if remaining <= 0:
+            with self._lock:
+                self._locks.pop(key, None)
+            return 0
+        return remaining
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._counters.pop(key, None)
+                self._locks.pop(key, None)
+
+
+class RedisBackend:
+    """ Shared counters in Redis so limits hold across workers and instances
+
+    Buckets are approximated with fixed windows: at most ``limit`` requests
+    per ``period`` seconds. Counters are created with SET NX EX and bumped
+    with INCR, which keeps the TTL, so any Redis 2.6.12+ server works.
+    Connection and command errors surface as BackendUnavailable.
+    """
+
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+        return cls(redis.Redis.from_url(url))
+
+    def _run(self, command, *args, **kwargs):
+        try:
+            return command(*args, **kwargs)
+        except REDIS_ERRORS as e:
+            raise BackendUnavailable(str(e)) from e
+
+    def take(self, key, limit, period):
+        window = int(time.time() // period)
+        count = self.incr(f"{key}:{window}", period)
+        if count <= limit:
+            return 0
+        return (window + 1) * period - time.time()
+
+    def incr(self, key, ttl):
+        def run():
+            pipe = self.client.pipeline()
+            pipe.set(self.prefix + key, 0, ex=math.ceil(ttl), nx=True)
+            pipe.incr(self.prefix + key)
+            return pipe.execute()
+
+        _, count = self._run(run)
+        return int(count)
+
+    def lock(self, key, ttl):
+        self._run(self.client.set, self.prefix + key, 1, px=math.ceil(ttl * 1000))
+
+    def lock_ttl(self, key):
+        remaining = self._run(self.client.pttl, self.prefix + key)
+        return remaining / 1000 if remaining and remaining > 0 else 0
+
+    def delete(self, *keys):
+        self._run(self.client.delete, *(self.prefix + key for key in keys))
+
+
+class RateLimiter:
+    """ Token-bucket limits per client IP and authenticated email, plus failed-login backoff
+
+    Failed-login backoff is checked before the user lookup and bcrypt, so a
+    client hammering bad credentials is turned away without costing either.
+    Per-IP backoff is opt-in, since many users can share one address, and
+    never applies to credentials that were recently verified.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.backend = MemoryBackend()
+        self.enabled = True
+        self.ip_limit = (120, 60)
+        self.user_limit = (60, 60)
+        self.failure_threshold = 5
+        self.failure_window = 300
+        self.backoff_base = 1.0
+        self.backoff_max = 300.0
+        self.ip_backoff = False
+        self.fail_open = True
+
+    def init_app(self, app):
+        """ Read limits and the backend from the app config """
+        config = app.config
+        self.enabled = config.get("RATE_LIMIT_ENABLED", self.enabled)
+        self.ip_limit = (
+            config.get("RATE_LIMIT_IP_REQUESTS", self.ip_limit[0]),
+            config.get("RATE_LIMIT_IP_PERIOD", self.ip_limit[1]),
+        )
+        self.user_limit = (
+            config.get("RATE_LIMIT_USER_REQUESTS", self.user_limit[0]),
+            config.get("RATE_LIMIT_USER_PERIOD", self.user_limit[1]),
+        )
+        self.failure_threshold = config.get("AUTH_FAILURE_THRESHOLD", self.failure_threshold)
+        self.failure_window = config.get("AUTH_FAILURE_WINDOW", self.failure_window)
+        self.backoff_base = config.get("AUTH_FAILURE_BACKOFF_BASE", self.backoff_base)
+        self.backoff_max = config.get("AUTH_FAILURE_BACKOFF_MAX", self.backoff_max)
+        self.ip_backoff = config.get("AUTH_FAILURE_IP_BACKOFF", self.ip_backoff)
+        self.fail_open = config.get("RATE_LIMIT_FAIL_OPEN", self.fail_open)
+        if config.get("RATE_LIMIT_BACKEND", "memory") == "redis":
+            self.backend = RedisBackend.from_url(config["RATE_LIMIT_REDIS_URL"])
+        else:
+            self.backend = MemoryBackend()
+
+    def _reject(self, scope, retry_after):
+        if self.stats is not None:
+            self.stats.incr(f".ratelimit.{scope}.rejected")
+        raise RateLimited(scope, retry_after)
+
+    def _call(self, method, *args, default=0):
+        """ Run a backend call, failing open (``default``) or closed when its store is down """
+        try:
+            return method(*args)
+        except BackendUnavailable as e:
+            if self.stats is not None:
+                self.stats.incr(".ratelimit.backend_error")
+            if self.fail_open:
+                logger.warning("Rate limit backend unavailable, allowing request: %s", e)
+                return default
+            logger.error("Rate limit backend unavailable, rejecting request: %s", e)
+            self._reject("unavailable", 1)
+
+    def _take(self, scope, key, limit):
+        requests, period = limit
+        if requests <= 0:
+            return
+        wait = self._call(self.backend.take, f"{scope}:{key}", requests, period)
+        if wait > 0:
+            self._reject(scope, wait)
+
+    def _check_lock(self, key):
+        remaining = self._call(self.backend.lock_ttl, f"backoff:{key}")
+        if remaining > 0:
+            self._reject("backoff", remaining)
+
+    def check_ip(self, ip):
+        if self.enabled:
+            self._take("ip", ip, self.ip_limit)
+
+    def check_user(self, email):
+        if self.enabled:
+            self._take("user", email.lower(), self.user_limit)
+
+    def check_backoff(self, email):
+        """ Reject while the email is backing off after repeated failed logins """
+        if self.enabled:
+            self._check_lock(f"email:{email.lower()}")
+
+    def check_ip_backoff(self, ip):
+        """ Reject while the IP is backing off; call only for credentials not yet verified """
+        if self.enabled and self.ip_backoff:
+            self._check_lock(f"ip:{ip}")
+
+    def record_failure(self, email, ip):
+        """ Count a failed login; past the threshold each failure doubles the backoff """
+        if not self.enabled:
+            return
+        if self.stats is not None:
+            self.stats.incr(".ratelimit.auth_failure")
+        keys = [f"email:{email.lower()}"] + ([f"ip:{ip}"] if self.ip_backoff else [])
+        for key in keys:
+            failures = self._call(self.backend.incr, f"failures:{key}", self.failure_window)
+            excess = failures - self.failure_threshold
+            if excess >= 0:
+                backoff = min(self.backoff_base * 2 ** min(excess, 32), self.backoff_max)
+                self._call(self.backend.lock, f"backoff:{key}", backoff, default=None)
+
+    def record_success(self, email):
+        if self.enabled:
+            key = f"email:{email.lower()}"
+            self._call(self.backend.delete, f"failures:{key}", f"backoff:{key}", default=None)
@@ -0,0 +1,96 @@
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import logger, statsd
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|:\w+)\s*\)")
+
+
+def statement_shape(statement):
+    """ Normalise a statement so the same query with different IN-list sizes compares equal """
+    return _PLACEHOLDER_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class SQLProfiler:
+    """ Opt-in per-request SQL profiler: statement counts, DB time, N+1 shapes and slow queries
+
+    Queries run by a streamed body happen after the response headers are
+    sent, so they are logged but not included in the headers.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.enabled = False
+        self.expose_headers = False
+        self.slow_query_ms = 100.0
+        self.repeat_threshold = 5
+
+    def init_app(self, app):
+        self.enabled = app.config.get("SQL_PROFILER_ENABLED", False)
+        # Headers leak query counts, so only debug/test apps or an explicit opt-in get them
+        self.expose_headers = self.enabled and (
+            app.config.get("SQL_PROFILER_HEADERS", False) or app.debug or app.testing
+        )
+        self.slow_query_ms = app.config.get("SQL_SLOW_QUERY_MS", self.slow_query_ms)
+        self.repeat_threshold = app.config.get("SQL_N_PLUS_ONE_THRESHOLD", self.repeat_threshold)
+        if self.enabled:
+            app.before_request(self._start_request)
+            app.after_request(self._finish_request)
+
+    def instrument_engine(self, engine):
+        if not self.enabled:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _start_request(self):
+        g.sql_profile = []
+
+    def _finish_request(self, response):
+        profile = g.get("sql_profile")
+        if profile is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        total_ms = sum(ms for _, ms in profile)
+        repeated = {
+            shape: count
+            for shape, count in Counter(shape for shape, _ in profile).items()
+            if count >= self.repeat_threshold
+        }
+        for shape, count in repeated.items():
+            logger.warning("Possible N+1 in %s: %d x %s", endpoint, count, shape)
+            if self.stats is not None:
+                self.stats.incr(f".sql.{endpoint}.n_plus_one")
+        if self.stats is not None:
+            # A timer, not a gauge, so statsd aggregates every request into a distribution
+            self.stats.timing(f".sql.{endpoint}.queries", len(profile))
+        if self.expose_headers:
+            response.headers["X-SQL-Queries"] = str(len(profile))
+            response.headers["X-SQL-Time-Ms"] = f"{total_ms:.2f}"
+            response.headers["X-SQL-Repeated"] = str(len(repeated))
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("sql_profiler_start")
+        if not started:
+            return
+        ms = (time.perf_counter() - started.pop()) * 1000
+        shape = statement_shape(statement)
+        in_request = has_request_context()
+        if ms >= self.slow_query_ms:
+            endpoint = (request.endpoint or "unmatched") if in_request else "-"
+            logger.warning("Slow query (%.1f ms) in %s: %s", ms, endpoint, shape)
+        profile = g.get("sql_profile") if in_request else None
+        if profile is not None:
+            profile.append((shape, ms))
+
+
+sql_profiler = SQLProfiler(stats=statsd)
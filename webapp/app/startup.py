@@ -0,0 +1,118 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from app.assignment_cache import assignment_cache
+from app.extensions import db, get_sns_client, logger, statsd
+from app.outbox import outbox
+from app.purge import assignment_purger
+from helper_func import load_users_from_csv
+
+
+class StartupReport:
+    """ Times named startup phases, then logs them and publishes statsd timers """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started_at) * 1000))
+
+    def emit(self, label="startup"):
+        if not self.phases:
+            return
+        total = sum(ms for _, ms in self.phases)
+        logger.info(
+            "%s phases: %s (total %.1fms)",
+            label.capitalize(),
+            ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases),
+            total,
+        )
+        if self.stats is not None:
+            for name, ms in self.phases:
+                self.stats.timing(f".{label}.{name}", ms)
+            self.stats.timing(f".{label}.total", total)
+        self.phases = []
+
+
+def schema_is_current(app):
+    """ True when the database is at the latest migration in the app's migrations directory """
+    state = startup_state(app)
+    if state["heads"] is None:
+        # The scripts only change with a deploy, so read them once per process
+        state["heads"] = set(ScriptDirectory(app.extensions["migrate"].directory).get_heads())
+    with db.engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads()) == state["heads"]
+
+
+def startup_state(app):
+    return app.extensions.setdefault(
+        "startup", {"ready": False, "lock": threading.Lock(), "heads": None, "next_check": 0.0}
+    )
+
+
+def ensure_ready(app, report=None):
+    """ Run the deferred database work once, returning whether the app is ready to serve
+
+    Without DB_CREATE_ALL the schema belongs to `flask db upgrade`; until the
+    database is at the latest migration nothing here touches it, so the CLI
+    can still load the app. Later calls check again, at most once per
+    READINESS_CACHE_SECONDS.
+    """
+    state = startup_state(app)
+    if state["ready"]:
+        return True
+    if time.monotonic() < state["next_check"]:
+        return False
+    with state["lock"]:
+        if state["ready"]:
+            return True
+        if time.monotonic() < state["next_check"]:
+            return False
+        own_report = report is None
+        report = report or StartupReport(statsd)
+        with app.app_context():
+            if app.config["DB_CREATE_ALL"]:
+                with report.phase("create_all"):
+                    # Replica binds are populated by replication, never by the app
+                    db.create_all(bind_key=None)
+            else:
+                with report.phase("schema_check"):
+                    current = schema_is_current(app)
+                if not current:
+                    logger.warning("Database schema is not at the latest migration; run `flask db upgrade`.")
+                    state["next_check"] = time.monotonic() + app.config["READINESS_CACHE_SECONDS"]
+                    return False
+            # Large deployments seed once with `flask seed-users` instead
+            if app.config["SEED_USERS_ON_STARTUP"]:
+                with report.phase("seed_users"):
+                    load_users_from_csv()
+        logger.info("Connected to database successfully.")
+        with report.phase("outbox"):
+            outbox.start()
+        with report.phase("purge"):
+            assignment_purger.start()
+        with report.phase("assignment_cache"):
+            assignment_cache.bus.ensure_listening()
+        state["ready"] = True
+        if own_report:
+            report.emit("warm_up")
+        return True
+
+
+def warm_up(app):
+    """ Explicit warm-up hook, e.g. from a gunicorn post_fork, for LAZY_INIT apps """
+    report = StartupReport(statsd)
+    ensure_ready(app, report)
+    with report.phase("sns_client"):
+        get_sns_client()
+    report.emit("warm_up")
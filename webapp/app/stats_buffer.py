@@ -0,0 +1,120 @@
+import atexit
+import threading
+from collections import OrderedDict
+
+from flask import g, has_request_context
+from statsd import StatsClient
+
+from app.background import BackgroundWorker
+
+
+class StatsAggregator(BackgroundWorker):
+    """ Pre-aggregates counters between flushes; gauges keep their last value, timers pass through
+
+    Sampled counters (``|@rate``) and gauge deltas are forwarded untouched,
+    since summing them would change their meaning.
+    """
+
+    thread_name = "statsd-aggregator"
+
+    def __init__(self, send, interval=1.0, maxudpsize=512):
+        super().__init__(interval=interval)
+        self.send = send
+        self.maxudpsize = maxudpsize
+        self._counters = OrderedDict()
+        self._gauges = OrderedDict()
+        self._lines = []
+        self._lock = threading.Lock()
+
+    def add(self, data):
+        self.ensure_running()
+        with self._lock:
+            for line in data.split("\n"):
+                name, _, value = line.partition(":")
+                amount, _, kind = value.partition("|")
+                if kind == "c":
+                    self._counters[name] = self._counters.get(name, 0) + float(amount)
+                elif kind == "g" and amount[:1] not in ("+", "-"):
+                    self._gauges[name] = amount
+                else:
+                    self._lines.append(line)
+
+    def _drain(self):
+        with self._lock:
+            lines = [f"{name}:{value:g}|c" for name, value in self._counters.items()]
+            lines += [f"{name}:{value}|g" for name, value in self._gauges.items()]
+            lines += self._lines
+            self._counters.clear()
+            self._gauges.clear()
+            self._lines = []
+        return lines
+
+    def flush(self):
+        """ Send everything aggregated so far, packed into as few datagrams as fit """
+        packet = ""
+        for line in self._drain():
+            if packet and len(packet) + len(line) + 1 >= self.maxudpsize:
+                self.send(packet)
+                packet = line
+            else:
+                packet = f"{packet}\n{line}" if packet else line
+        if packet:
+            self.send(packet)
+
+    def run_once(self):
+        self.flush()
+
+    def stop(self, timeout=None):
+        super().stop(timeout)
+        self.flush()
+
+
+class BufferedStatsClient(StatsClient):
+    """ StatsClient that coalesces each request's metrics into one pipeline, sent at teardown
+
+    Outside a request, metrics go straight out, or to the aggregator when
+    one is configured.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer_requests = True
+        self.aggregator = None
+
+    def init_app(self, app):
+        """ Read buffering and aggregation settings from the app config """
+        self.buffer_requests = app.config.get("STATSD_REQUEST_BUFFER", self.buffer_requests)
+        interval = app.config.get("STATSD_AGGREGATE_INTERVAL", 0)
+        if self.aggregator is not None:
+            self.aggregator.stop()
+            self.aggregator = None
+        if interval > 0:
+            self.aggregator = StatsAggregator(
+                super()._send, interval=interval, maxudpsize=self._maxudpsize
+            )
+            atexit.register(self.aggregator.stop)
+        app.teardown_request(self._flush_request)
+
+    def _after(self, data):
+        if not data:
+            return  # Sampled out
+        if self.buffer_requests and has_request_context():
+            if "stats_pipeline" not in g:
+                g.stats_pipeline = self.pipeline()
+            if g.stats_pipeline is not None:
+                g.stats_pipeline._after(data)
+                return
+        self._send(data)
+
+    def _send(self, data):
+        if self.aggregator is not None:
+            self.aggregator.add(data)
+        else:
+            super()._send(data)
+
+    def _flush_request(self, exc=None):
+        pipeline = g.get("stats_pipeline")
+        # Anything emitted after the flush (later teardown hooks) is sent directly
+        g.stats_pipeline = None
+        if pipeline is not None and pipeline._stats:
+            pipeline.send()
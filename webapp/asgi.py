@@ -0,0 +1,13 @@
+"""ASGI entry point, served next to wsgi.py:
+
+    uvicorn asgi:app
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+
+The routes stay synchronous and run on a pool of ASGI_THREADS threads,
+like gunicorn's gthread worker; the event loop holds idle connections.
+"""
+from app import create_app
+from app.asgi_bridge import PooledWsgiToAsgi
+from config import Config
+
+app = PooledWsgiToAsgi(create_app(), max_threads=Config.ASGI_THREADS)
@@ -0,0 +1,278 @@
+"""Offline load test: drive each /v1 endpoint and report machine-readable JSON.
+
+Boots create_app against a throwaway SQLite file (or --database-url, e.g. a
+disposable Postgres), with SNS and statsd stubbed out, seeds users,
+assignments and submissions, then serves the app on a local threaded server
+and runs a closed-loop load against one endpoint at a time. Run from the
+webapp directory:
+
+    python -m benchmarks.load_bench --users 20 --assignments 500 \\
+        --concurrency 8 --duration 5 --output before.json
+
+Per endpoint it reports req/s, p50/p95/p99, SQL statements per request and
+the process's peak RSS so far (client threads included), ready to diff
+between commits.
+"""
+import argparse
+import base64
+import http.client
+import itertools
+import json
+import os
+import resource
+import subprocess
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, insert
+from werkzeug.serving import make_server
+
+from benchmarks.serving_bench import run_load
+
+PASSWORD = "P@ssw0rd"
+DEADLINE = "2099-01-01T00:00:00.000Z"
+ENDPOINTS = (
+    "list", "list_full", "get", "create", "update", "batch", "submit", "submissions", "delete",
+)
+
+
+def make_app(database_url):
+    from app import create_app
+    from config import Config
+
+    class LoadConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SEED_USERS_ON_STARTUP = False
+        DB_CREATE_ALL = True
+        OUTBOX_DISPATCHER_ENABLED = False
+        OUTBOX_TRANSPORT = "memory"
+        RATE_LIMIT_ENABLED = False
+
+    return create_app(LoadConfig)
+
+
+def stub_external_services():
+    """No statsd datagrams leave the process; OUTBOX_TRANSPORT=memory already keeps SNS local"""
+    import app.extensions as extensions
+
+    extensions.statsd._send = lambda data: None
+
+
+def seed(app, users, assignments, submissions):
+    """Insert bench users (one shared bcrypt hash), assignments owned round-robin, and submissions"""
+    from app import db
+    from app.extensions import bcrypt
+    from app.models import Assignment, Submission, User
+
+    password_hash = bcrypt.generate_password_hash(PASSWORD).decode("utf-8")
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"first_name": "Bench", "last_name": str(i), "email": f"bench{i}@example.com",
+             "password_hash": password_hash}
+            for i in range(users)
+        ])
+        user_ids = [u.id for u in User.query.filter(User.email.like("bench%@example.com"))
+                    .order_by(User.id)]
+        rows = [
+            {"id": str(uuid4()), "name": f"assignment {i}", "points": 1 + i % 10,
+             "num_of_attempts": 10, "deadline": now + timedelta(days=365),
+             "assignment_created": now + timedelta(microseconds=i),
+             "created_by": user_ids[i % users]}
+            for i in range(assignments)
+        ]
+        if rows:
+            db.session.execute(insert(Assignment), rows)
+        if submissions and rows:
+            db.session.execute(insert(Submission), [
+                {"assignment_id": rows[i % len(rows)]["id"],
+                 "user_id": user_ids[i % users], "submission_url": "https://example.com/s.zip",
+                 "submission_date": now, "assignment_updated": now}
+                for i in range(submissions)
+            ])
+        db.session.commit()
+        db.session.remove()
+    owned = {}
+    for row in rows:
+        owned.setdefault(user_ids.index(row["created_by"]), []).append(row["id"])
+    return [row["id"] for row in rows], owned
+
+
+def auth_headers(users):
+    def headers(index):
+        token = base64.b64encode(f"bench{index % users}@example.com:{PASSWORD}".encode()).decode()
+        return {"Authorization": f"Basic {token}", "Content-Type": "application/json"}
+    return headers
+
+
+def request_factories(users, assignment_ids, owned, delete_pool):
+    """One next_request(client_index) per endpoint"""
+    body = json.dumps(
+        {"name": "load", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+    ).encode()
+    batch = json.dumps({"operations": [
+        {"op": "create", "data": {"name": f"batch {i}", "points": 5, "num_of_attempts": 3,
+                                  "deadline": DEADLINE}}
+        for i in range(10)
+    ]}).encode()
+    submission = json.dumps({"submission_url": "https://example.com/s.zip"}).encode()
+    cycles = {}
+    lock = threading.Lock()
+
+    def cycle(key, values):
+        with lock:
+            if key not in cycles:
+                cycles[key] = itertools.cycle(values)
+            return next(cycles[key])
+
+    def pop(index):
+        with lock:
+            pool = delete_pool.get(index % users)
+            return pool.pop() if pool else "exhausted"
+
+    return {
+        "list": lambda i: ("GET", "/v1/assignments?limit=50", None),
+        "list_full": lambda i: ("GET", "/v1/assignments", None),
+        "get": lambda i: ("GET", f"/v1/assignments/{cycle('get', assignment_ids)}", None),
+        "create": lambda i: ("POST", "/v1/assignments", body),
+        "update": lambda i: (
+            "PUT", f"/v1/assignments/{cycle(('update', i % users), owned[i % users])}", body
+        ),
+        "batch": lambda i: ("POST", "/v1/assignments:batch", batch),
+        "submit": lambda i: (
+            "POST", f"/v1/assignments/{cycle(('submit', i), assignment_ids)}/submission", submission
+        ),
+        "submissions": lambda i: ("GET", "/v1/submissions?limit=50", None),
+        "delete": lambda i: ("DELETE", f"/v1/assignments/{pop(i)}", None),
+    }
+
+
+def seed_delete_pool(app, users, per_user=500):
+    """Assignments reserved for the delete endpoint, so it never runs dry during a run"""
+    from app import db
+    from app.models import Assignment, User
+
+    now = datetime.utcnow()
+    with app.app_context():
+        user_ids = [u.id for u in User.query.filter(User.email.like("bench%@example.com"))
+                    .order_by(User.id)]
+        rows = [
+            {"id": str(uuid4()), "name": f"disposable {i}", "points": 1, "num_of_attempts": 1,
+             "deadline": now + timedelta(days=365), "created_by": user_ids[i % users]}
+            for i in range(users * per_user)
+        ]
+        db.session.execute(insert(Assignment), rows)
+        db.session.commit()
+        db.session.remove()
+    pool = {}
+    for i, row in enumerate(rows):
+        pool.setdefault(i % users, []).append(row["id"])
+    return pool
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def take(self):
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+
+def warm_up(port, headers, users):
+    """One request per user fills the credential cache, so bcrypt runs once per user"""
+    for index in range(users):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        connection.request("GET", "/v1/assignments?limit=1", headers=headers(index))
+        connection.getresponse().read()
+        connection.close()
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--assignments", type=int, default=500)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5, help="seconds per endpoint")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load.db')}"
+        stub_external_services()
+        app = make_app(database_url)
+        assignment_ids, owned = seed(app, args.users, args.assignments, args.submissions)
+        delete_pool = {}
+
+        from app import db
+
+        with app.app_context():
+            counter = StatementCounter(db.engine)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+
+        headers = auth_headers(args.users)
+        factories = request_factories(args.users, assignment_ids, owned, delete_pool)
+        warm_up(port, headers, args.users)
+        results = {}
+        for name in args.endpoints.split(","):
+            if name == "delete":
+                # Seeded only now so the extra rows do not skew the other endpoints
+                delete_pool.update(seed_delete_pool(app, args.users))
+            counter.take()
+            result = run_load(port, factories[name], headers, args.concurrency, args.duration)
+            total = result["requests"] + result["errors"]
+            result["queries_per_request"] = round(counter.take() / total, 2) if total else None
+            result["peak_rss_mb"] = peak_rss_mb()
+            results[name] = result
+
+        server.shutdown()
+        if args.database_url:
+            with app.app_context():
+                db.drop_all(bind_key=None)
+
+    report = {
+        "commit": git_commit(),
+        "database": database_url.split(":", 1)[0],
+        "users": args.users,
+        "assignments": args.assignments,
+        "submissions": args.submissions,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Micro-benchmark: assignment list serialization, legacy path vs projection fast path.
+
+Run from the webapp directory:
+
+    python -m benchmarks.serialization_bench --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert, select
+
+from app import create_app, db
+from app.json_provider import orjson
+from app.models import Assignment, User
+from config import Config
+
+
+def make_app(db_path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+        SEED_USERS_ON_STARTUP = False
+        DB_CREATE_ALL = True
+        OUTBOX_DISPATCHER_ENABLED = False
+        OUTBOX_TRANSPORT = "memory"
+
+    return create_app(BenchConfig)
+
+
+def seed(rows):
+    db.session.execute(
+        insert(User),
+        [{"id": 1, "first_name": "Bench", "last_name": "User",
+          "email": "bench@example.com", "password_hash": "x"}],
+    )
+    now = datetime.utcnow()
+    db.session.execute(
+        insert(Assignment),
+        [
+            {
+                "id": str(uuid4()),
+                "name": f"assignment {i}",
+                "points": 1 + i % 10,
+                "num_of_attempts": 1 + i % 3,
+                "deadline": now + timedelta(days=30, microseconds=i),
+                "assignment_created": now + timedelta(microseconds=i),
+                "assignment_updated": now + timedelta(seconds=i) if i % 2 else None,
+                "created_by": 1,
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def legacy_path(app, stdlib_provider):
+    """ORM objects, serialize() per row, then Flask's stdlib jsonify."""
+    assignments = Assignment.query.all()
+    return stdlib_provider.response([a.serialize() for a in assignments]).get_data()
+
+
+def orm_fast_encoder_path(app, _):
+    """ORM objects and serialize(), encoded by FastJSONProvider."""
+    assignments = Assignment.query.all()
+    return app.json.response([a.serialize() for a in assignments]).get_data()
+
+
+def projection_path(app, _):
+    """Column projection rows encoded directly by FastJSONProvider."""
+    rows = db.session.execute(select(*Assignment.projection())).all()
+    return app.json.dumps_rows(Assignment.SERIALIZED_COLUMNS, rows)
+
+
+def measure(app, fn, repeat, stdlib_provider):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        # Start from an empty identity map so ORM paths pay for hydration every time
+        db.session.expire_all()
+        db.session.expunge_all()
+        started_at = time.perf_counter()
+        size = len(fn(app, stdlib_provider))
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return {
+        "min_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "bench.db"))
+        stdlib_provider = DefaultJSONProvider(app)
+        with app.app_context():
+            seed(args.rows)
+            results = {
+                name: measure(app, fn, args.repeat, stdlib_provider)
+                for name, fn in (
+                    ("legacy_orm_serialize_stdlib", legacy_path),
+                    ("orm_serialize_fast_encoder", orm_fast_encoder_path),
+                    ("projection_fast_encoder", projection_path),
+                )
+            }
+            db.session.remove()
+
+    legacy = results["legacy_orm_serialize_stdlib"]["median_ms"]
+    for result in results.values():
+        result["speedup"] = round(legacy / result["median_ms"], 2)
+    print(json.dumps(
+        {"rows": args.rows, "orjson": orjson is not None, "results": results}, indent=2
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Serving-mode benchmark: gunicorn sync and gthread workers (wsgi.py) vs ASGI (asgi.py).
+
+Each mode serves the same app on SQLite; the report shows throughput,
+latency and the server's total RSS, so modes can be compared at a fixed
+memory budget. Run from the webapp directory:
+
+    python -m benchmarks.serving_bench --workers 4 --threads 32 \\
+        --concurrency 32 --duration 10 --io-delay-ms 50
+
+--io-delay-ms adds a sleep to every request, standing in for time spent
+waiting on Postgres or SNS. sync runs --workers single-threaded processes;
+gthread and asgi both run one process with --threads request threads, so
+they differ only in the server in front of the same thread pool.
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+WEBAPP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_EMAIL = "alice.smith@gmail.com"
+BENCH_PASSWORD = "P@ssw0rd"
+
+
+def make_bench_app():
+    """App factory used by the server subprocesses; settings come from BENCH_* variables"""
+    from app import create_app
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.environ['BENCH_DB']}"
+        OUTBOX_DISPATCHER_ENABLED = False
+        DB_CREATE_ALL = True
+        OUTBOX_TRANSPORT = "memory"
+        RATE_LIMIT_ENABLED = False
+
+    app = create_app(BenchConfig)
+    delay = float(os.environ.get("BENCH_IO_DELAY_MS", 0)) / 1000
+    if delay:
+        @app.before_request
+        def simulated_io_wait():
+            time.sleep(delay)
+    return app
+
+
+def make_asgi_app():
+    from app.asgi_bridge import PooledWsgiToAsgi
+
+    return PooledWsgiToAsgi(make_bench_app(), max_threads=int(os.environ["BENCH_THREADS"]))
+
+
+def seed_database(db_path, rows):
+    """Create the schema, the login.csv users and ``rows`` assignments"""
+    os.environ["BENCH_DB"] = db_path
+    from app import db
+    from app.models import Assignment, User
+
+    app = make_bench_app()
+    with app.app_context():
+        owner = User.query.filter_by(email=BENCH_EMAIL).one()
+        now = datetime.utcnow()
+        if rows:
+            db.session.execute(insert(Assignment), [
+                {
+                    "id": str(uuid4()),
+                    "name": f"assignment {i}",
+                    "points": 1 + i % 10,
+                    "num_of_attempts": 1 + i % 3,
+                    "deadline": now + timedelta(days=30),
+                    "assignment_created": now + timedelta(microseconds=i),
+                    "created_by": owner.id,
+                }
+                for i in range(rows)
+            ])
+        db.session.commit()
+        db.session.remove()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_rss_kb(pid):
+    """Resident memory of a process and all of its descendants, from /proc"""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending += [int(child) for child in children.read().split()]
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+class PeakRSS:
+    """Samples a process tree's RSS in the background and keeps the peak"""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, process_tree_rss_kb(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def wait_until_serving(server, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with status {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/livez")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run_load(port, next_request, headers, concurrency, duration):
+    """Closed-loop load: ``concurrency`` clients on keep-alive connections for ``duration`` seconds
+
+    ``next_request(client_index)`` returns the (method, path, body) to send
+    next; ``headers`` is a dict or a per-client callable.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        client_headers = headers(index) if callable(headers) else headers
+        local_latencies, local_errors = [], 0
+        while time.monotonic() < stop_at:
+            method, path, body = next_request(index)
+            started_at = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=client_headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local_latencies.append((time.perf_counter() - started_at) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+    return summarize(latencies, sum(errors), elapsed)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 2)
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else None,
+    }
+
+
+def server_command(mode, port, args):
+    bind = f"127.0.0.1:{port}"
+    gunicorn = [sys.executable, "-m", "gunicorn", "--bind", bind, "--log-level", "warning"]
+    if mode == "sync":
+        return gunicorn + [
+            "--workers", str(args.workers), "benchmarks.serving_bench:make_bench_app()",
+        ]
+    if mode == "gthread":
+        return gunicorn + [
+            "--worker-class", "gthread", "--workers", "1", "--threads", str(args.threads),
+            "benchmarks.serving_bench:make_bench_app()",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "--factory", "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "benchmarks.serving_bench:make_asgi_app",
+    ]
+
+
+def bench_mode(mode, args, env):
+    port = free_port()
+    server = subprocess.Popen(
+        server_command(mode, port, args), cwd=WEBAPP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        wait_until_serving(server, port)
+        token = base64.b64encode(f"{BENCH_EMAIL}:{BENCH_PASSWORD}".encode()).decode()
+        headers = {"Authorization": f"Basic {token}"}
+
+        def next_request(_):
+            return "GET", args.path, None
+
+        # Sequential warm-up fills each worker's credential cache before the concurrent run
+        run_load(port, next_request, headers, 1, 1)
+        with PeakRSS(server.pid) as rss:
+            result = run_load(port, next_request, headers, args.concurrency, args.duration)
+        result["peak_rss_mb"] = round(rss.peak_kb / 1024, 1)
+        result["req_per_s_per_100mb"] = round(result["req_per_s"] / rss.peak_kb * 1024 * 100, 1)
+        return result
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modes", default="sync,gthread,asgi", help="comma-separated: sync, gthread, asgi"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn sync workers")
+    parser.add_argument(
+        "--threads", type=int, default=32, help="request threads for both gthread and asgi"
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--rows", type=int, default=200, help="assignments to seed")
+    parser.add_argument("--io-delay-ms", type=float, default=50)
+    parser.add_argument("--path", default="/v1/assignments?limit=50")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed_database(db_path, args.rows)
+        env = dict(
+            os.environ,
+            BENCH_DB=db_path,
+            BENCH_IO_DELAY_MS=str(args.io_delay_ms),
+            BENCH_THREADS=str(args.threads),
+            SEED_USERS_ON_STARTUP="false",
+        )
+        results = {mode: bench_mode(mode, args, env) for mode in args.modes.split(",")}
+
+    print(json.dumps({
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "threads": args.threads,
+        "io_delay_ms": args.io_delay_ms,
+        "path": args.path,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
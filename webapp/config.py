@@ -22,4 +22,82 @@ class Config:
     SNS_TOPIC_ARN = os.getenv("SNS_TOPIC_ARN")
     AWS_PROFILE_NAME = os.getenv("AWS_PROFILE_NAME")
     SQLALCHEMY_DATABASE_URI = f'postgresql://{DB_USER}:{DB_PASSWORD}@{HOST_NAME}:5432/{DB_NAME}'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "false").lower() == "true"  # Queue records for a listener thread
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json" (JSON lines)
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Records beyond this are dropped and counted
+    LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")  # e.g. "INFO=0.1" keeps 10% of INFO lines
+    # Comma-separated replica URIs; GET requests read from these when set
+    SQLALCHEMY_BINDS = {
+        f"replica_{i}": uri.strip()
+        for i, uri in enumerate(os.getenv("DATABASE_REPLICA_URIS", "").split(","))
+        if uri.strip()
+    }
+    REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", 5))  # Read-your-writes window
+    REPLICA_PIN_REDIS_URL = os.getenv("REPLICA_PIN_REDIS_URL", "")  # Share pins across workers for clients without cookies; empty keeps them per worker
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # Seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # Seconds, -1 never recycles
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER_MODE", "false").lower() == "true"  # NullPool, no client-side pooling
+    AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 1024))  # 0 disables the cache
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", 300))  # Seconds
+    AUTH_EXECUTOR_WORKERS = int(os.getenv("AUTH_EXECUTOR_WORKERS", 2))  # 0 runs bcrypt inline
+    AUTH_EXECUTOR_QUEUE_DEPTH = int(os.getenv("AUTH_EXECUTOR_QUEUE_DEPTH", 8))
+    AUTH_EXECUTOR_TIMEOUT = float(os.getenv("AUTH_EXECUTOR_TIMEOUT", 10))  # Seconds
+    STATSD_REQUEST_BUFFER = os.getenv("STATSD_REQUEST_BUFFER", "true").lower() == "true"  # One packet per request
+    STATSD_AGGREGATE_INTERVAL = float(os.getenv("STATSD_AGGREGATE_INTERVAL", 0))  # Seconds, 0 disables
+    SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "false").lower() == "true"
+    SQL_PROFILER_HEADERS = os.getenv("SQL_PROFILER_HEADERS", "false").lower() == "true"  # X-SQL-* headers; never in production
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 100))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))  # Repeats of one statement shape
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))  # Proxies in front of the app, 1 behind the ALB; 0 trusts no X-Forwarded-For
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_FAIL_OPEN = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() == "true"  # Allow requests while the Redis backend is down
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" (per worker) or "redis" (shared)
+    RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_IP_REQUESTS = int(os.getenv("RATE_LIMIT_IP_REQUESTS", 120))  # Per RATE_LIMIT_IP_PERIOD, 0 disables
+    RATE_LIMIT_IP_PERIOD = float(os.getenv("RATE_LIMIT_IP_PERIOD", 60))  # Seconds
+    RATE_LIMIT_USER_REQUESTS = int(os.getenv("RATE_LIMIT_USER_REQUESTS", 60))  # Per RATE_LIMIT_USER_PERIOD, 0 disables
+    RATE_LIMIT_USER_PERIOD = float(os.getenv("RATE_LIMIT_USER_PERIOD", 60))  # Seconds
+    AUTH_FAILURE_THRESHOLD = int(os.getenv("AUTH_FAILURE_THRESHOLD", 5))  # Failed logins before backoff starts
+    AUTH_FAILURE_WINDOW = int(os.getenv("AUTH_FAILURE_WINDOW", 300))  # Seconds failures are remembered
+    AUTH_FAILURE_BACKOFF_BASE = float(os.getenv("AUTH_FAILURE_BACKOFF_BASE", 1))  # Seconds, doubles per failure
+    AUTH_FAILURE_BACKOFF_MAX = float(os.getenv("AUTH_FAILURE_BACKOFF_MAX", 300))  # Seconds
+    AUTH_FAILURE_IP_BACKOFF = os.getenv("AUTH_FAILURE_IP_BACKOFF", "false").lower() == "true"  # Also back off per client IP
+    ASSIGNMENTS_PAGE_DEFAULT_LIMIT = int(os.getenv("ASSIGNMENTS_PAGE_DEFAULT_LIMIT", 50))
+    ASSIGNMENTS_PAGE_MAX_LIMIT = int(os.getenv("ASSIGNMENTS_PAGE_MAX_LIMIT", 500))
+    SUBMISSIONS_PAGE_DEFAULT_LIMIT = int(os.getenv("SUBMISSIONS_PAGE_DEFAULT_LIMIT", 50))
+    SUBMISSIONS_PAGE_MAX_LIMIT = int(os.getenv("SUBMISSIONS_PAGE_MAX_LIMIT", 500))
+    ASSIGNMENTS_BATCH_MAX_SIZE = int(os.getenv("ASSIGNMENTS_BATCH_MAX_SIZE", 500))  # Operations per batch request
+    ASSIGNMENTS_SOFT_DELETE = os.getenv("ASSIGNMENTS_SOFT_DELETE", "true").lower() == "true"  # false deletes in the request
+    ASSIGNMENT_CACHE_MAX_SIZE = int(os.getenv("ASSIGNMENT_CACHE_MAX_SIZE", 4096))  # 0 disables the cache
+    ASSIGNMENT_CACHE_TTL = float(os.getenv("ASSIGNMENT_CACHE_TTL", 30))  # Seconds
+    ASSIGNMENT_CACHE_BUS = os.getenv("ASSIGNMENT_CACHE_BUS", "auto")  # "postgres" (LISTEN/NOTIFY), "memory" (this worker only) or "auto"
+    ASSIGNMENT_CACHE_CHANNEL = os.getenv("ASSIGNMENT_CACHE_CHANNEL", "assignment_cache")  # NOTIFY channel
+    IDEMPOTENCY_ENABLED = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() == "true"  # Honor Idempotency-Key on POSTs
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 86400))  # Seconds a stored response is replayed
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))  # Seconds a duplicate waits before 409
+    IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 60))  # Seconds before an unfinished claim is abandoned
+    IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", 300))  # Seconds between expired-key purges per worker
+    PURGE_ENABLED = os.getenv("PURGE_ENABLED", "true").lower() == "true"  # Background purge of soft-deleted assignments
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 1000))  # Submissions deleted per transaction
+    PURGE_ASSIGNMENTS_PER_RUN = int(os.getenv("PURGE_ASSIGNMENTS_PER_RUN", 50))
+    PURGE_INTERVAL = float(os.getenv("PURGE_INTERVAL", 60))  # Seconds
+    ASSIGNMENTS_STREAM_CHUNK_SIZE = int(os.getenv("ASSIGNMENTS_STREAM_CHUNK_SIZE", 500))
+    READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", 5))
+    READINESS_POOL_SATURATION = float(os.getenv("READINESS_POOL_SATURATION", 1.0))  # Fraction of pool capacity
+    READINESS_FAIL_ON_SATURATION = os.getenv("READINESS_FAIL_ON_SATURATION", "false").lower() == "true"  # Otherwise saturation is only reported
+    ASGI_THREADS = int(os.getenv("ASGI_THREADS", 16))  # Requests asgi.py runs at once per process
+    LAZY_INIT = os.getenv("LAZY_INIT", "false").lower() == "true"
+    DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() == "true"  # Create tables at startup instead of `flask db upgrade`; tests and throwaway DBs only
+    SEED_USERS_ON_STARTUP = os.getenv("SEED_USERS_ON_STARTUP", "true").lower() == "true"
+    SEED_USERS_CSV = os.getenv("SEED_USERS_CSV", "login.csv")
+    OUTBOX_DISPATCHER_ENABLED = os.getenv("OUTBOX_DISPATCHER_ENABLED", "true").lower() == "true"
+    OUTBOX_TRANSPORT = os.getenv("OUTBOX_TRANSPORT", "sns")  # "sns" or "memory"
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+    OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", 1))  # Seconds
+    OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", 300))  # Seconds
+    OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))  # Seconds
\ No newline at end of file
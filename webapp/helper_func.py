@@ -1,7 +1,13 @@
+import base64
 import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt as bcrypt_lib
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.models import User
-from app.extensions import db
-from flask import Response, request, jsonify
+from app.extensions import db, request_metrics
+from flask import Response, current_app, request, jsonify
 from datetime import datetime
 
 import re
@@ -25,29 +31,139 @@ def is_valid_password(password):
     
     return True
 
-def create_response(status_code, data=None):
-    response = jsonify(data) if data else Response()
-    response.status_code = status_code
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+def set_default_headers(response, etag=None):
+    if etag:
+        # Let clients keep the body but revalidate it with If-None-Match
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+    else:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers['X-Content-Type-Options'] = 'nosniff'
     return response
 
 
-def load_users_from_csv():
-    with open('login.csv', 'r') as file:
+def create_response(status_code, data=None, etag=None):
+    with request_metrics.stage("serialize"):
+        response = jsonify(data) if data else Response()
+    response.status_code = status_code
+    return set_default_headers(response, etag)
+
+
+def create_rows_response(status_code, columns, rows, etag=None):
+    """ Like create_response, but encodes projected row tuples without building model objects """
+    with request_metrics.stage("serialize"):
+        if rows:
+            response = Response(
+                current_app.json.dumps_rows(columns, rows), mimetype="application/json"
+            )
+        else:
+            response = Response()
+    response.status_code = status_code
+    return set_default_headers(response, etag)
+
+
+def encode_cursor(*values):
+    """ Encode keyset values into an opaque, URL-safe pagination cursor """
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """ Decode a cursor produced by encode_cursor, returning None if it is malformed """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def parse_page_limit(raw_limit, default, maximum):
+    """ Parse a ?limit= value, returning None if it is not a positive integer """
+    if raw_limit is None:
+        return default
+    try:
+        limit = int(raw_limit)
+    except ValueError:
+        return None
+    if limit < 1:
+        return None
+    return min(limit, maximum)
+
+
+def _hash_password(args):
+    """ Hash one password; module-level so a process pool can pickle it """
+    password, rounds, prefix = args
+    salt = bcrypt_lib.gensalt(rounds=rounds, prefix=prefix)
+    return bcrypt_lib.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def read_users_csv(path="login.csv"):
+    """ Return the valid rows of a users CSV, keeping the first row per email """
+    users = {}
+    with open(path, "r") as file:
         csv_reader = csv.DictReader(file)
         for row in csv_reader:
             if is_valid_email(row['email']) and is_valid_password(row['password']) and len(row['first_name']) > 0 and len(row['last_name']) > 0:
-                user = User.query.filter_by(email=row['email']).first()
-                if not user:
-                    new_user = User(
-                        first_name=row['first_name'],
-                        last_name=row['last_name'],
-                        email=row['email']
-                    )
-                    new_user.password = row['password']
-                    db.session.add(new_user)
-        db.session.commit()
+                users.setdefault(row['email'], row)
+    return list(users.values())
+
+
+def hash_passwords(passwords, processes=1):
+    """ bcrypt-hash passwords in order; processes other than 1 use a pool (None: one per CPU) """
+    rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+    prefix = current_app.config.get("BCRYPT_HASH_PREFIX", "2b").encode("utf-8")
+    work = [(password, rounds, prefix) for password in passwords]
+    # A pool only pays for itself once there is more than a little to hash
+    if processes == 1 or len(work) < 4:
+        return [_hash_password(item) for item in work]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_hash_password, work, chunksize=max(1, len(work) // 32)))
+
+
+def seed_users(path="login.csv", processes=1, batch_size=500):
+    """ Insert users from a CSV that do not exist yet, returning how many were added """
+    rows = read_users_csv(path)
+    existing = set()
+    for start in range(0, len(rows), batch_size):
+        emails = [row['email'] for row in rows[start:start + batch_size]]
+        existing.update(
+            db.session.scalars(select(User.email).where(User.email.in_(emails)))
+        )
+    new_rows = [row for row in rows if row['email'] not in existing]
+    if not new_rows:
+        return 0
+
+    hashes = hash_passwords([row['password'] for row in new_rows], processes)
+    now = datetime.utcnow()
+    values = [
+        {
+            "first_name": row['first_name'],
+            "last_name": row['last_name'],
+            "email": row['email'],
+            "password_hash": password_hash,
+            "account_created": now,
+            "account_updated": now,
+        }
+        for row, password_hash in zip(new_rows, hashes)
+    ]
+
+    statement = insert(User)
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Another worker may be seeding the same file concurrently
+        statement = pg_insert(User).on_conflict_do_nothing(index_elements=["email"])
+    for start in range(0, len(values), batch_size):
+        db.session.execute(statement, values[start:start + batch_size])
+    db.session.commit()
+    return len(values)
+
+
+def load_users_from_csv():
+    # Hashed serially: forking a process pool inside a gunicorn worker is left to `flask seed-users`
+    seed_users(current_app.config.get("SEED_USERS_CSV", "login.csv"), processes=1)
 
 
 
@@ -56,4 +172,29 @@ def validate_datetime_format(dt_str):
         dt_obj = datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%fZ")
         return True, dt_obj
     except ValueError:
-        return False, None
\ No newline at end of file
+        return False, None
+
+
+def validate_assignment_fields(data, check_ranges=True):
+    """ Apply the assignment create/update rules to a request body; return (error, fields) """
+    if not isinstance(data, dict) or not data:
+        return "Request body must be present", None
+
+    fields = {arg: data.get(arg) for arg in ("name", "points", "num_of_attempts", "deadline")}
+    if not all(fields.values()):
+        return "Missing required fields", None
+
+    if check_ranges:
+        if not isinstance(fields["points"], int) or not (1 <= fields["points"] <= 10):
+            return "Points must be between 1 and 10", None
+        if not isinstance(fields["num_of_attempts"], int) or not (1 <= fields["num_of_attempts"] <= 10):
+            return "Number of attempts must be between 1 and 10", None
+
+    try:
+        valid_flag, processed_deadline = validate_datetime_format(fields["deadline"])
+    except TypeError:
+        valid_flag = False
+    if not valid_flag:
+        return "Invalid deadline format", None
+    fields["deadline"] = processed_deadline
+    return None, fields
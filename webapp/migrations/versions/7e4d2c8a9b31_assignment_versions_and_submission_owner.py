@@ -0,0 +1,38 @@
+"""assignment versions and submission owner
+
+Revision ID: 7e4d2c8a9b31
+Revises: 3c9f1a2b7d10
+Create Date: 2026-10-16 22:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4d2c8a9b31'
+down_revision = '3c9f1a2b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.create_index('ix_assignment_created_id', ['assignment_created', 'id'], unique=False)
+
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('user_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('submission_user_id_fkey', 'user', ['user_id'], ['id'])
+        batch_op.create_index('ix_submission_assignment_id_user_id', ['assignment_id', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.drop_index('ix_submission_assignment_id_user_id')
+        batch_op.drop_constraint('submission_user_id_fkey', type_='foreignkey')
+        batch_op.drop_column('user_id')
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignment_created_id')
+        batch_op.drop_column('version')
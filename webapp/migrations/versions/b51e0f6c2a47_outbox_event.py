@@ -0,0 +1,38 @@
+"""outbox event
+
+Revision ID: b51e0f6c2a47
+Revises: 7e4d2c8a9b31
+Create Date: 2026-10-16 23:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b51e0f6c2a47'
+down_revision = '7e4d2c8a9b31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('topic_arn', sa.String(length=256), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('outbox_event', schema=None) as batch_op:
+        batch_op.create_index('ix_outbox_event_next_attempt_at', ['next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('outbox_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_outbox_event_next_attempt_at')
+
+    op.drop_table('outbox_event')
@@ -0,0 +1,54 @@
+"""assignment soft delete and submission cascade
+
+Revision ID: d4f7a2e91c55
+Revises: b51e0f6c2a47
+Create Date: 2026-10-16 23:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f7a2e91c55'
+down_revision = 'b51e0f6c2a47'
+branch_labels = None
+depends_on = None
+
+# The initial schema left this foreign key unnamed; this is the name Postgres gave it
+naming_convention = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def upgrade():
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.drop_index('ix_assignment_created_id')
+        batch_op.create_index(
+            'ix_assignment_live_created_id', ['assignment_created', 'id'], unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'),
+        )
+        batch_op.create_index(
+            'ix_assignment_deleted_at', ['deleted_at'], unique=False,
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+            sqlite_where=sa.text('deleted_at IS NOT NULL'),
+        )
+
+    with op.batch_alter_table('submission', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('submission_assignment_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'submission_assignment_id_fkey', 'assignment', ['assignment_id'], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None, naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('submission_assignment_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'submission_assignment_id_fkey', 'assignment', ['assignment_id'], ['id']
+        )
+
+    with op.batch_alter_table('assignment', schema=None) as batch_op:
+        batch_op.drop_index('ix_assignment_deleted_at')
+        batch_op.drop_index('ix_assignment_live_created_id')
+        batch_op.create_index('ix_assignment_created_id', ['assignment_created', 'id'], unique=False)
+        batch_op.drop_column('deleted_at')
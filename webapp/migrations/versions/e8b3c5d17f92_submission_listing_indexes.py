@@ -0,0 +1,31 @@
+"""submission listing indexes
+
+Revision ID: e8b3c5d17f92
+Revises: d4f7a2e91c55
+Create Date: 2026-10-16 23:55:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3c5d17f92'
+down_revision = 'd4f7a2e91c55'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_submission_assignment_id_date_id', ['assignment_id', 'submission_date', 'id'], unique=False
+        )
+        batch_op.create_index(
+            'ix_submission_user_id_date_id', ['user_id', 'submission_date', 'id'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.drop_index('ix_submission_user_id_date_id')
+        batch_op.drop_index('ix_submission_assignment_id_date_id')
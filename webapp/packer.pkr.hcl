@@ -155,6 +155,7 @@ build {
       "Group=www-data",
       "WorkingDirectory=${var.app_dir}",
       "Environment=PATH=${var.app_dir}/env/bin",
+      "ExecStartPre=${var.app_dir}/env/bin/flask db upgrade",
       "ExecStart=${var.app_dir}/env/bin/gunicorn --bind 0.0.0.0:8000 wsgi:app",
       "Restart=on-failure",
       "RestartSec=1s",
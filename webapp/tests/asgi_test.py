@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+
+from app.asgi_bridge import PooledWsgiToAsgi, build_environ
+from tests.assignments_test import DEADLINE, OWNER
+from tests.conftest import basic_auth
+
+
+def asgi_get(asgi_app, path, headers=None, method="GET", body=b""):
+    """Drive one request through the ASGI app; return (status, headers, body)"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 5000), "server": ("testserver", 80),
+    }
+    messages = []
+
+    # The body arrives in two messages, as servers send large bodies
+    chunks = [
+        {"type": "http.request", "body": body[:10], "more_body": True},
+        {"type": "http.request", "body": body[10:], "more_body": False},
+    ]
+
+    async def receive():
+        return chunks.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+def test_asgi_matches_wsgi_responses_and_errors(offline_app, offline_client):
+    asgi_app = PooledWsgiToAsgi(offline_app, max_threads=4)
+    for path, headers in (
+        ("/v1/assignments", basic_auth(OWNER)),
+        ("/v1/assignments", basic_auth(OWNER, "Wr0ng!pass")),
+        ("/v1/missing", None),
+    ):
+        status, _, body = asgi_get(asgi_app, path, headers)
+        expected = offline_client.get(path, headers=headers)
+        assert (status, body) == (expected.status_code, expected.get_data())
+
+
+def test_asgi_passes_request_bodies_through(offline_app, offline_client):
+    asgi_app = PooledWsgiToAsgi(offline_app, max_threads=4)
+    body = json.dumps({"name": "hw", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}).encode()
+    headers = dict(
+        basic_auth(OWNER), **{"Content-Type": "application/json", "Content-Length": str(len(body))}
+    )
+    status, _, created = asgi_get(asgi_app, "/v1/assignments", headers, "POST", body)
+    assert status == 201
+
+    assignment_id = json.loads(created)["id"]
+    response = offline_client.get(f"/v1/assignments/{assignment_id}", headers=basic_auth(OWNER))
+    assert response.get_json()["name"] == "hw"
+
+
+def test_asgi_requests_run_on_the_pool_not_one_shared_thread():
+    seen = set()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wsgi(environ, start_response):
+        seen.add(threading.current_thread().name)
+        barrier.wait()  # Deadlocks if requests are serialized onto one thread
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    asgi_app = PooledWsgiToAsgi(wsgi, max_threads=2)
+
+    async def both():
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(None, asgi_get, asgi_app, "/") for _ in range(2)
+        ))
+
+    asyncio.run(both())
+    assert len(seen) == 2
+
+
+def test_repeated_cookie_headers_stay_separate_cookies():
+    scope = {
+        "method": "GET", "path": "/", "query_string": b"", "http_version": "1.1",
+        "headers": [(b"cookie", b"db_pin=abc"), (b"cookie", b"other=1"), (b"accept", b"a"),
+                    (b"accept", b"b")],
+    }
+    environ = build_environ(scope, None)
+    assert environ["HTTP_COOKIE"] == "db_pin=abc; other=1"
+    assert environ["HTTP_ACCEPT"] == "a,b"
@@ -0,0 +1,114 @@
+import time
+from collections import Counter
+
+from app.assignment_cache import AssignmentCache, MemoryBus, assignment_cache
+from tests.assignments_test import DEADLINE, OWNER, make_assignment
+from tests.conftest import basic_auth
+
+
+class RecordingStats:
+    def __init__(self):
+        self.counts = Counter()
+
+    def incr(self, stat, count=1):
+        self.counts[stat] += count
+
+
+class CountingLoader:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def __call__(self, assignment_id):
+        self.calls += 1
+        return self.rows.get(assignment_id)
+
+
+def test_hits_skip_the_loader_and_are_counted():
+    stats = RecordingStats()
+    cache = AssignmentCache(stats=stats, max_size=2, ttl=60)
+    load = CountingLoader({"a": {"id": "a"}, "b": {"id": "b"}, "c": {"id": "c"}})
+
+    for assignment_id in ("a", "a", "b", "a", "c", "b"):
+        cache.get(assignment_id, load)
+    assert cache.get("missing", load) is None
+
+    # "b" was least recently used when "c" arrived, so it was loaded again
+    assert load.calls == 5
+    assert stats.counts[".assignment_cache.hit"] == 2
+    assert stats.counts[".assignment_cache.miss"] == 5
+    assert stats.counts[".assignment_cache.evict"] == 2
+
+
+def test_expired_entries_are_reloaded(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    cache = AssignmentCache(ttl=30)
+    load = CountingLoader({"a": {"id": "a"}})
+
+    cache.get("a", load)
+    clock[0] += 29
+    cache.get("a", load)
+    clock[0] += 2
+    cache.get("a", load)
+    assert load.calls == 2
+
+
+def test_invalidation_reaches_every_cache_on_the_bus():
+    bus = MemoryBus()
+    workers = [AssignmentCache(), AssignmentCache()]
+    for cache in workers:
+        cache.bus = bus
+        bus.subscribe(cache._evict)
+    load = CountingLoader({"a": {"id": "a"}})
+    for cache in workers:
+        cache.get("a", load)
+
+    workers[0].invalidate("a")
+    assert [len(cache) for cache in workers] == [0, 0]
+
+
+def test_a_load_overlapping_an_invalidation_is_not_stored():
+    cache = AssignmentCache()
+
+    def stale_load(assignment_id):
+        # Another worker commits and invalidates while this read is in flight
+        cache.invalidate(assignment_id)
+        return {"id": assignment_id, "name": "before"}
+
+    assert cache.get("a", stale_load)["name"] == "before"
+    assert len(cache) == 0
+
+
+def test_an_unhealthy_bus_bypasses_the_cache():
+    stats = RecordingStats()
+    cache = AssignmentCache(stats=stats)
+    cache.bus.healthy = False
+    load = CountingLoader({"a": {"id": "a"}})
+
+    cache.get("a", load)
+    cache.get("a", load)
+    assert load.calls == 2
+    assert stats.counts[".assignment_cache.bypass"] == 2
+
+
+def test_updates_and_deletes_invalidate_other_workers(offline_client):
+    other_worker = AssignmentCache()
+    assignment_cache.bus.subscribe(other_worker._evict)
+    created = make_assignment(offline_client)
+    path = f"/v1/assignments/{created['id']}"
+    auth = basic_auth(OWNER)
+
+    assert offline_client.get(path, headers=auth).get_json()["name"] == "hw"
+    other_worker.get(created["id"], lambda _: created)
+    assert created["id"] in assignment_cache._entries
+
+    body = {"name": "renamed", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+    assert offline_client.put(path, json=body, headers=auth).status_code == 204
+    assert len(other_worker) == 0
+    response = offline_client.get(path, headers=auth)
+    assert response.get_json()["name"] == "renamed"
+    assert response.headers["ETag"].strip('"').endswith("-2")
+
+    assert offline_client.delete(path, headers=auth).status_code == 204
+    assert offline_client.get(path, headers=auth).status_code == 404
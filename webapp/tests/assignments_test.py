@@ -0,0 +1,146 @@
+import json
+
+import pytest
+from tests.conftest import basic_auth
+
+OWNER = "alice.smith@gmail.com"
+DEADLINE = "2099-01-01T00:00:00.000Z"
+
+
+def make_assignment(client, name="hw", auth=None):
+    body = {"name": name, "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+    response = client.post("/v1/assignments", json=body, headers=auth or basic_auth(OWNER))
+    assert response.status_code == 201
+    return response.get_json()
+
+
+@pytest.fixture
+def seeded_client(offline_client):
+    for i in range(5):
+        make_assignment(offline_client, name=f"hw{i}")
+    return offline_client
+
+
+def test_keyset_pagination_walks_every_assignment_once(seeded_client):
+    names, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = seeded_client.get(
+            "/v1/assignments", query_string=params, headers=basic_auth(OWNER)
+        )
+        assert response.status_code == 200
+        names += [a["name"] for a in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert names == [f"hw{i}" for i in range(5)]
+
+
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"limit": "x"}, {"cursor": "bogus"}])
+def test_invalid_pagination_parameters_are_rejected(seeded_client, params):
+    response = seeded_client.get(
+        "/v1/assignments", query_string=params, headers=basic_auth(OWNER)
+    )
+    assert response.status_code == 400
+
+
+def test_streamed_listing_matches_buffered_listing(seeded_client, offline_app):
+    offline_app.config["ASSIGNMENTS_STREAM_CHUNK_SIZE"] = 2
+    auth = basic_auth(OWNER)
+    buffered = seeded_client.get("/v1/assignments", headers=auth).get_json()
+
+    ndjson = seeded_client.get("/v1/assignments?stream=ndjson", headers=auth)
+    assert ndjson.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.data.decode().splitlines()]
+
+    array = seeded_client.get("/v1/assignments?stream=json", headers=auth).get_json()
+    assert sorted(a["id"] for a in lines) == sorted(a["id"] for a in buffered)
+    assert array == lines
+
+
+def test_conditional_get_returns_304_until_the_assignment_changes(offline_client):
+    auth = basic_auth(OWNER)
+    assignment = make_assignment(offline_client)
+    url = f"/v1/assignments/{assignment['id']}"
+
+    first = offline_client.get(url, headers=auth)
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = offline_client.get(url, headers={**auth, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+    body = {"name": "renamed", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+    assert offline_client.put(url, json=body, headers=auth).status_code == 204
+    changed = offline_client.get(url, headers={**auth, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_list_etag_changes_on_create_and_delete(seeded_client):
+    auth = basic_auth(OWNER)
+    etag = seeded_client.get("/v1/assignments", headers=auth).headers["ETag"]
+    conditional = {**auth, "If-None-Match": etag}
+    assert seeded_client.get("/v1/assignments", headers=conditional).status_code == 304
+
+    created = make_assignment(seeded_client, name="late")
+    assert seeded_client.get("/v1/assignments", headers=conditional).status_code == 200
+
+    etag = seeded_client.get("/v1/assignments", headers=auth).headers["ETag"]
+    seeded_client.delete(f"/v1/assignments/{created['id']}", headers=auth)
+    response = seeded_client.get(
+        "/v1/assignments", headers={**auth, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+def test_submission_attempts_are_counted_per_user(offline_client):
+    assignment = make_assignment(offline_client)
+    url = f"/v1/assignments/{assignment['id']}/submission"
+    body = {"submission_url": "https://example.com/hw.zip"}
+
+    for email in (OWNER, "bob.johnson@gmail.com"):
+        statuses = [
+            offline_client.post(url, json=body, headers=basic_auth(email)).status_code
+            for _ in range(assignment["num_of_attempts"] + 1)
+        ]
+        assert statuses == [201, 201, 201, 400]
+
+
+def test_batch_applies_creates_and_updates_with_per_item_results(seeded_client):
+    owned = seeded_client.get("/v1/assignments", headers=basic_auth(OWNER)).get_json()[0]
+    other = make_assignment(seeded_client, name="bobs", auth=basic_auth("bob.johnson@gmail.com"))
+    body = {"name": "renamed", "points": 7, "num_of_attempts": 2, "deadline": DEADLINE}
+    operations = [
+        {"op": "create", "data": {"name": "new", "points": 3, "num_of_attempts": 1, "deadline": DEADLINE}},
+        {"op": "create", "data": {"name": "bad", "points": 11, "num_of_attempts": 1, "deadline": DEADLINE}},
+        {"op": "update", "id": owned["id"], "data": body},
+        {"op": "update", "id": other["id"], "data": body},
+        {"op": "update", "id": "missing", "data": body},
+        {"op": "delete"},
+    ]
+    response = seeded_client.post(
+        "/v1/assignments:batch", json={"operations": operations}, headers=basic_auth(OWNER)
+    )
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [201, 400, 204, 403, 404, 400]
+    assert results[1]["error"] == "Points must be between 1 and 10"
+
+    created = seeded_client.get(f"/v1/assignments/{results[0]['id']}", headers=basic_auth(OWNER))
+    assert created.get_json()["name"] == "new"
+    updated = seeded_client.get(f"/v1/assignments/{owned['id']}", headers=basic_auth(OWNER))
+    assert updated.get_json()["name"] == "renamed"
+    assert updated.headers["ETag"] != f'W/"{owned["id"]}-1"'
+
+
+def test_batch_rejects_oversized_requests(offline_app, offline_client):
+    offline_app.config["ASSIGNMENTS_BATCH_MAX_SIZE"] = 1
+    operations = [{"op": "create", "data": {}}] * 2
+    response = offline_client.post(
+        "/v1/assignments:batch", json={"operations": operations}, headers=basic_auth(OWNER)
+    )
+    assert response.status_code == 400
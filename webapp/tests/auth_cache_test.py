@@ -0,0 +1,91 @@
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from app import db
+from app.auth_cache import CredentialCache
+from app.extensions import credential_cache, statsd
+from app.models import User
+from tests.conftest import basic_auth
+
+OWNER = "alice.smith@gmail.com"
+PASSWORD = "P@ssw0rd"
+
+
+class RecordingStats:
+    def __init__(self):
+        self.counts = Counter()
+
+    def incr(self, stat, count=1):
+        self.counts[stat] += count
+
+
+def user(user_id=1, password_hash="hash-1"):
+    return SimpleNamespace(id=user_id, password_hash=password_hash)
+
+
+def test_hits_misses_and_evictions_are_counted():
+    stats = RecordingStats()
+    cache = CredentialCache(stats=stats, max_size=2, ttl=60)
+    alice, bob, carol = user(1), user(2), user(3)
+
+    assert not cache.lookup("alice", PASSWORD, alice)
+    cache.store("alice", PASSWORD, alice)
+    assert cache.lookup("alice", PASSWORD, alice)
+    assert not cache.lookup("alice", "wrong", alice)
+
+    # A third user pushes out the least recently used entry
+    cache.store("bob", PASSWORD, bob)
+    cache.store("carol", PASSWORD, carol)
+    assert not cache.lookup("alice", PASSWORD, alice)
+
+    assert stats.counts[".auth.cache.hit"] == 1
+    assert stats.counts[".auth.cache.miss"] == 3
+    assert stats.counts[".auth.cache.evict"] == 1
+
+
+def test_entries_are_evicted_once_the_ttl_passes(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    stats = RecordingStats()
+    cache = CredentialCache(stats=stats, ttl=30)
+    alice = user()
+
+    cache.store("alice", PASSWORD, alice)
+    clock[0] += 29
+    assert cache.lookup("alice", PASSWORD, alice)
+    clock[0] += 2
+    assert not cache.lookup("alice", PASSWORD, alice)
+    assert len(cache) == 0
+    assert stats.counts[".auth.cache.evict"] == 1
+
+
+def test_a_changed_hash_misses_even_without_the_listener():
+    cache = CredentialCache()
+    cache.store("alice", PASSWORD, user(password_hash="old"))
+    assert not cache.lookup("alice", PASSWORD, user(password_hash="new"))
+
+
+def test_changing_a_password_evicts_cached_credentials(offline_app, offline_client, monkeypatch):
+    stats = RecordingStats()
+    monkeypatch.setattr(statsd, "incr", stats.incr)
+
+    assert offline_client.get("/v1/assignments", headers=basic_auth(OWNER)).status_code == 200
+    assert offline_client.get("/v1/assignments", headers=basic_auth(OWNER)).status_code == 200
+    assert stats.counts[".auth.cache.miss"] == 1
+    assert stats.counts[".auth.cache.hit"] == 1
+    assert len(credential_cache) == 1
+
+    with offline_app.app_context():
+        owner = User.query.filter_by(email=OWNER).one()
+        owner.password = "N3w!passw0rd"
+        # The set listener evicts before the change is even committed
+        assert len(credential_cache) == 0
+        db.session.commit()
+    assert stats.counts[".auth.cache.invalidate"] == 1
+
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER))
+    assert response.status_code == 401
+    assert stats.counts[".auth.cache.miss"] == 2
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER, "N3w!passw0rd"))
+    assert response.status_code == 200
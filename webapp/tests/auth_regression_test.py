@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+from app import db
+from app.extensions import auth_executor, bcrypt, credential_cache
+from tests.conftest import basic_auth
+
+OWNER = "alice.smith@gmail.com"
+DEADLINE = "2099-01-01T00:00:00.000Z"
+ASSIGNMENT = {"name": "hw", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+
+# Upper bound on SQL statements per request, including the auth lookup
+STATEMENT_BUDGET = {
+    "list": 3,
+    "get": 2,
+    "create": 3,
+    "update": 3,
+    "delete": 4,
+    "submit": 7,
+}
+
+
+class AuthCostCounter:
+    """Counts bcrypt verifications and SQL statements issued by one request"""
+
+    def __init__(self, app, monkeypatch):
+        self.bcrypt_calls = 0
+        self.statements = 0
+        check_password_hash = bcrypt.check_password_hash
+
+        def counting_check(*args, **kwargs):
+            self.bcrypt_calls += 1
+            return check_password_hash(*args, **kwargs)
+
+        monkeypatch.setattr(bcrypt, "check_password_hash", counting_check)
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def measure(self, send):
+        credential_cache.clear()
+        self.bcrypt_calls = self.statements = 0
+        response = send()
+        return response, self.bcrypt_calls, self.statements
+
+
+@pytest.fixture
+def counter(offline_app, monkeypatch):
+    return AuthCostCounter(offline_app, monkeypatch)
+
+
+def test_each_endpoint_verifies_credentials_once(offline_client, counter):
+    auth = basic_auth(OWNER)
+    response = offline_client.post("/v1/assignments", json=ASSIGNMENT, headers=auth)
+    ass_id = response.get_json()["id"]
+
+    requests = {
+        "list": lambda: offline_client.get("/v1/assignments", headers=auth),
+        "get": lambda: offline_client.get(f"/v1/assignments/{ass_id}", headers=auth),
+        "create": lambda: offline_client.post(
+            "/v1/assignments", json=ASSIGNMENT, headers=auth
+        ),
+        "update": lambda: offline_client.put(
+            f"/v1/assignments/{ass_id}", json=ASSIGNMENT, headers=auth
+        ),
+        "submit": lambda: offline_client.post(
+            f"/v1/assignments/{ass_id}/submission",
+            json={"submission_url": "https://example.com/hw.zip"},
+            headers=auth,
+        ),
+        "delete": lambda: offline_client.delete(
+            f"/v1/assignments/{ass_id}", headers=auth
+        ),
+    }
+
+    for name, send in requests.items():
+        response, bcrypt_calls, statements = counter.measure(send)
+        assert response.status_code < 300, name
+        assert bcrypt_calls == 1, f"{name} ran bcrypt {bcrypt_calls} times"
+        assert statements <= STATEMENT_BUDGET[name], (
+            f"{name} issued {statements} statements"
+        )
+
+
+def test_cached_credentials_skip_bcrypt(offline_client, counter):
+    auth = basic_auth(OWNER)
+    offline_client.get("/v1/assignments", headers=auth)
+
+    counter.bcrypt_calls = 0
+    response = offline_client.get("/v1/assignments", headers=auth)
+    assert response.status_code == 200
+    assert counter.bcrypt_calls == 0
+
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER, "Wr0ng!pw"))
+    assert response.status_code == 401
+    assert counter.bcrypt_calls == 1
+
+
+def test_saturated_auth_executor_fails_fast(offline_client, monkeypatch):
+    release = threading.Event()
+    check_password_hash = bcrypt.check_password_hash
+
+    def slow_check(*args, **kwargs):
+        release.wait(5)
+        return check_password_hash(*args, **kwargs)
+
+    monkeypatch.setattr(bcrypt, "check_password_hash", slow_check)
+    monkeypatch.setattr(auth_executor, "max_workers", 1)
+    monkeypatch.setattr(auth_executor, "max_queue", 0)
+    auth_executor.shutdown()
+    credential_cache.clear()
+
+    blocked = threading.Thread(
+        target=offline_client.application.test_client().get,
+        args=("/v1/assignments",),
+        kwargs={"headers": basic_auth(OWNER)},
+    )
+    blocked.start()
+    try:
+        while auth_executor._slots is None or auth_executor._slots._value:
+            time.sleep(0.01)
+        response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER))
+        assert response.status_code == 503
+    finally:
+        release.set()
+        blocked.join()
+        auth_executor.shutdown()
@@ -0,0 +1,63 @@
+import threading
+
+from app.background import BackgroundWorker
+
+
+class CountingWorker(BackgroundWorker):
+    thread_name = "counting-worker"
+
+    def __init__(self, interval=60.0):
+        super().__init__(interval=interval)
+        self.calls = 0
+        self.ran = threading.Event()
+
+    def run_once(self):
+        self.calls += 1
+        self.ran.set()
+
+
+def test_wake_runs_an_iteration_without_waiting_for_the_interval():
+    worker = CountingWorker()
+    worker.ensure_running()
+    try:
+        assert not worker.ran.wait(0.1)
+        worker.wake()
+        assert worker.ran.wait(5)
+        assert worker.calls == 1
+    finally:
+        worker.stop(timeout=5)
+    assert not worker.running
+
+
+def test_a_forked_process_starts_its_own_thread():
+    worker = CountingWorker()
+    worker.ensure_running()
+    parent_thread = worker._thread
+    worker.ensure_running()
+    assert worker._thread is parent_thread
+
+    # After a fork the child inherits the parent's thread object, but not the thread
+    worker._thread_pid = -1
+    assert not worker.running
+    worker.ensure_running()
+    try:
+        assert worker._thread is not parent_thread
+        assert worker.running
+    finally:
+        worker.stop(timeout=5)
+
+
+def test_a_failing_iteration_does_not_kill_the_thread():
+    class FlakyWorker(CountingWorker):
+        def run_once(self):
+            super().run_once()
+            if self.calls == 1:
+                raise RuntimeError("boom")
+
+    worker = FlakyWorker(interval=0.01)
+    worker.ensure_running()
+    try:
+        while worker.calls < 2:
+            worker.ran.wait(5)
+    finally:
+        worker.stop(timeout=5)
@@ -0,0 +1,46 @@
+import base64
+import os
+
+import pytest
+from app import create_app, db
+from config import Config
+
+WEBAPP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class OfflineTestConfig(Config):
+    """SQLite-backed config for tests that must run without Postgres or AWS"""
+
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    OUTBOX_DISPATCHER_ENABLED = False
+    PURGE_ENABLED = False
+    OUTBOX_TRANSPORT = "memory"
+    DB_CREATE_ALL = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+
+
+def basic_auth(email, password="P@ssw0rd"):
+    token = base64.b64encode(f"{email}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+@pytest.fixture
+def offline_app(tmp_path, monkeypatch):
+    # login.csv is read relative to the webapp directory
+    monkeypatch.chdir(WEBAPP_DIR)
+
+    class _Config(OfflineTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'webapp.db'}"
+
+    app = create_app(_Config)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def offline_client(offline_app):
+    with offline_app.test_client() as client:
+        yield client
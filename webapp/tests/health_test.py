@@ -0,0 +1,70 @@
+from sqlalchemy.pool import NullPool
+
+from app import db
+from app.db_pool import InstrumentedQueuePool, build_engine_options
+from app.extensions import statsd
+from app.health import readiness_probe
+
+
+def test_livez_does_no_database_work(offline_client, monkeypatch):
+    monkeypatch.setattr(readiness_probe, "ping", lambda: 1 / 0)
+    assert offline_client.get("/livez").status_code == 200
+
+
+def test_readyz_caches_the_database_probe(offline_client, monkeypatch):
+    pings = []
+    monkeypatch.setattr(readiness_probe, "ping", lambda: pings.append(1) or True)
+    monkeypatch.setattr(readiness_probe, "interval", 60)
+
+    for _ in range(3):
+        response = offline_client.get("/readyz")
+        assert response.status_code == 200
+    assert len(pings) == 1
+    assert response.get_json()["database"] == "ok"
+
+
+def test_readyz_reports_database_failure(offline_client, monkeypatch):
+    monkeypatch.setattr(readiness_probe, "ping", lambda: False)
+    monkeypatch.setattr(readiness_probe, "interval", 0)
+
+    response = offline_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.get_json()["database"] == "unavailable"
+    assert offline_client.get("/healthz").status_code == 503
+
+
+def test_pool_saturation_is_reported_unless_failing_is_opted_in(offline_client, monkeypatch):
+    monkeypatch.setattr(readiness_probe, "ping", lambda: True)
+    monkeypatch.setattr(
+        readiness_probe, "pool_status",
+        lambda: {"checked_out": 15, "capacity": 15, "saturation": 1.0},
+    )
+
+    response = offline_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["pool"]["saturated"] is True
+
+    monkeypatch.setattr(readiness_probe, "fail_on_saturation", True)
+    assert offline_client.get("/readyz").status_code == 503
+
+
+def test_pool_is_instrumented_and_reported(offline_app, offline_client, monkeypatch):
+    stats = []
+    monkeypatch.setattr(statsd, "timing", lambda stat, value: stats.append(stat))
+    monkeypatch.setattr(statsd, "gauge", lambda stat, value: stats.append(stat))
+
+    with offline_app.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
+    monkeypatch.setattr(readiness_probe, "interval", 0)
+    response = offline_client.get("/readyz")
+
+    assert response.get_json()["pool"]["capacity"] == 15
+    assert ".db.pool.checkout_wait" in stats
+    assert ".db.pool.primary.checked_out" in stats
+
+
+def test_pgbouncer_mode_disables_client_side_pooling():
+    options = build_engine_options(
+        {"SQLALCHEMY_DATABASE_URI": "postgresql://u:p@db/app", "DB_PGBOUNCER_MODE": True}
+    )
+    assert options["poolclass"] is NullPool
@@ -0,0 +1,174 @@
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import db
+from app.idempotency import idempotency
+from app.models import Assignment, IdempotencyKey, OutboxEvent, Submission
+from tests.assignments_test import DEADLINE, OWNER, make_assignment
+from tests.conftest import basic_auth
+
+OTHER = "bob.johnson@gmail.com"
+BODY = {"name": "hw", "points": 5, "num_of_attempts": 3, "deadline": DEADLINE}
+
+
+def keyed(email, key):
+    return dict(basic_auth(email), **{"Idempotency-Key": key})
+
+
+def count(app, column):
+    with app.app_context():
+        return db.session.scalar(select(func.count(column)))
+
+
+def test_a_retried_create_replays_the_first_response(offline_app, offline_client):
+    first = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    retry = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert count(offline_app, Assignment.id) == 1
+
+    # Keys belong to the caller, so another user's request runs on its own
+    other = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OTHER, "k1"))
+    assert other.get_json()["id"] != first.get_json()["id"]
+    assert count(offline_app, Assignment.id) == 2
+
+
+def test_a_retried_submission_neither_burns_an_attempt_nor_publishes_twice(
+    offline_app, offline_client
+):
+    assignment = make_assignment(offline_client)
+    path = f"/v1/assignments/{assignment['id']}/submission"
+    body = {"submission_url": "https://example.com/s.zip"}
+
+    responses = [
+        offline_client.post(path, json=body, headers=keyed(OWNER, "submit-1")) for _ in range(3)
+    ]
+    assert {r.status_code for r in responses} == {201}
+    assert count(offline_app, Submission.id) == 1
+    assert count(offline_app, OutboxEvent.id) == 1
+
+
+def test_reusing_a_key_for_a_different_request_is_rejected(offline_client):
+    offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    response = offline_client.post(
+        "/v1/assignments", json=dict(BODY, name="other"), headers=keyed(OWNER, "k1")
+    )
+    assert response.status_code == 422
+
+
+def test_failed_requests_release_their_key(offline_app, offline_client):
+    path = "/v1/assignments/missing/submission"
+    body = {"submission_url": "https://example.com/s.zip"}
+    assert offline_client.post(path, json=body, headers=keyed(OWNER, "k1")).status_code == 404
+    assert count(offline_app, IdempotencyKey.key) == 0
+
+
+def test_concurrent_duplicates_run_the_handler_once(offline_app, monkeypatch):
+    app_module = sys.modules["app"]
+    original, calls = app_module.validate_assignment_fields, []
+
+    def slow_validate(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "validate_assignment_fields", slow_validate)
+    responses = []
+
+    def post():
+        with offline_app.test_client() as client:
+            responses.append(client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1")))
+
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.status_code for r in responses] == [201] * 4
+    assert len({r.get_json()["id"] for r in responses}) == 1
+    assert len(calls) == 1
+    assert count(offline_app, Assignment.id) == 1
+
+
+def reopen_claims(app, locked_until):
+    """Turn stored responses back into the in-progress claims another worker would hold"""
+    with app.app_context():
+        db.session.execute(
+            IdempotencyKey.__table__.update().values(
+                status_code=None, response_body=None, locked_until=locked_until
+            )
+        )
+        db.session.commit()
+
+
+def test_a_key_held_by_another_worker_times_out_with_409(offline_app, offline_client, monkeypatch):
+    monkeypatch.setattr(idempotency, "wait_timeout", 0.1)
+    offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    reopen_claims(offline_app, datetime.utcnow() + timedelta(minutes=1))
+
+    response = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    assert response.status_code == 409
+    assert count(offline_app, Assignment.id) == 1
+
+
+def test_an_abandoned_claim_is_taken_over(offline_app, offline_client):
+    offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    reopen_claims(offline_app, datetime.utcnow() - timedelta(seconds=1))
+
+    response = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_expired_keys_are_purged(offline_app, offline_client):
+    offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    with offline_app.app_context():
+        db.session.execute(
+            IdempotencyKey.__table__.update().values(
+                expires_at=datetime.utcnow() - timedelta(seconds=1)
+            )
+        )
+        db.session.commit()
+        assert idempotency.purge_expired() == 1
+    assert count(offline_app, IdempotencyKey.key) == 0
+
+
+def test_the_response_is_committed_with_the_handlers_writes(offline_app, offline_client, monkeypatch):
+    def crash(self):
+        raise RuntimeError("worker died before the response was stored")
+
+    # Failing between the handler's writes and its response leaves neither behind
+    monkeypatch.setattr(Assignment, "serialize", crash)
+    offline_client.application.config["PROPAGATE_EXCEPTIONS"] = False
+    response = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    assert response.status_code == 500
+    assert count(offline_app, Assignment.id) == 0
+    assert count(offline_app, IdempotencyKey.key) == 0
+
+    monkeypatch.undo()
+    response = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    assert response.status_code == 201
+    assert count(offline_app, Assignment.id) == 1
+
+
+def test_a_request_whose_claim_was_taken_over_rolls_back(offline_app, offline_client, monkeypatch):
+    app_module = sys.modules["app"]
+    original = app_module.validate_assignment_fields
+
+    def outlive_the_lock(*args, **kwargs):
+        # Another worker takes the key over while this handler is still running
+        reopen_claims(offline_app, datetime.utcnow() + timedelta(minutes=5))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "validate_assignment_fields", outlive_the_lock)
+    response = offline_client.post("/v1/assignments", json=BODY, headers=keyed(OWNER, "k1"))
+    assert response.status_code == 409
+    assert count(offline_app, Assignment.id) == 0
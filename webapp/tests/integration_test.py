@@ -1,5 +1,9 @@
+import threading
+import time
+
 import pytest
 from app import create_app, db
+from app.assignment_cache import PostgresBus
 from config import Config
 from app.models import User
 from sqlalchemy import MetaData, create_engine
@@ -13,6 +17,7 @@ class TestConfig(Config):
     HOST_NAME = "localhost"
     DB_NAME = "healthcheck"
     JWT_SECRET_KEY = "secret"
+    DB_CREATE_ALL = True
     SQLALCHEMY_DATABASE_URI = (
         f"postgresql://{DB_USER}:{DB_PASSWORD}@{HOST_NAME}:5432/{DB_NAME}"
     )
@@ -72,3 +77,28 @@ def test_healthz_endpoint_headers(client):
     response = client.get("/healthz")
     assert response.headers["Cache-Control"] == "no-cache, no-store, must-revalidate"
     assert response.headers["X-Content-Type-Options"] == "nosniff"
+
+
+def test_assignment_cache_invalidations_cross_listen_notify():
+    engine = create_engine(TestConfig.SQLALCHEMY_DATABASE_URI)
+    received, arrived = [], threading.Event()
+    listener = PostgresBus(engine, channel="assignment_cache_test", poll_interval=0.5)
+
+    def record(assignment_id):
+        # None is the clear-everything signal sent after each (re)connect
+        if assignment_id is not None:
+            received.append(assignment_id)
+            arrived.set()
+
+    listener.subscribe(record)
+    listener.ensure_listening()
+    deadline = time.monotonic() + 10
+    while not listener.healthy and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    PostgresBus(engine, channel="assignment_cache_test").publish(["a", "b"])
+    assert arrived.wait(10)
+    time.sleep(0.2)
+    listener.stop()
+    engine.dispose()
+    assert received == ["a", "b"]
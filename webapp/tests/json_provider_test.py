@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+import app.json_provider as json_provider
+from app.models import Assignment
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import basic_auth
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def provider(request, offline_app, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_provider, "orjson", None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+    return offline_app.json
+
+
+def test_datetimes_encode_as_iso_8601(provider):
+    moment = datetime(2030, 1, 2, 3, 4, 5, 678901)
+    assert provider.loads(provider.dumps({"at": moment})) == {"at": moment.isoformat()}
+
+
+def test_row_projection_matches_model_serialization(provider, offline_client, offline_app):
+    created = make_assignment(offline_client)
+    with offline_app.app_context():
+        assignment = Assignment.query.get(created["id"])
+        row = tuple(getattr(assignment, c) for c in Assignment.SERIALIZED_COLUMNS)
+        encoded = provider.dumps_rows(Assignment.SERIALIZED_COLUMNS, [row])
+        assert provider.loads(encoded) == [assignment.serialize()]
+
+    listed = offline_client.get("/v1/assignments", headers=basic_auth(OWNER)).get_json()
+    single = offline_client.get(
+        f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER)
+    ).get_json()
+    assert listed == [single]
@@ -0,0 +1,53 @@
+import json
+import logging
+
+from app.log_pipeline import (
+    AsyncLogPipeline,
+    BoundedQueueHandler,
+    JsonLinesFormatter,
+    LevelSampler,
+    parse_sample_rates,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(self.format(record))
+
+
+def make_record(level=logging.INFO, msg="Assignments retrieved successfully."):
+    return logging.LogRecord("webapp", level, __file__, 1, msg, None, None)
+
+
+def test_json_lines_formatter_emits_one_object_per_record():
+    entry = json.loads(JsonLinesFormatter().format(make_record(msg="hello")))
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "hello"
+
+
+def test_sampler_only_thins_configured_levels():
+    sampler = LevelSampler(parse_sample_rates("INFO=0.25, bogus=1"), rng=iter([0.1, 0.5]).__next__)
+    assert sampler.filter(make_record())
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(logging.ERROR))
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    handler = BoundedQueueHandler(maxsize=1)
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_async_pipeline_delivers_records_through_the_listener():
+    sink = ListHandler()
+    pipeline = AsyncLogPipeline([sink], maxsize=10)
+    pipeline.start()
+    pipeline.queue_handler.handle(make_record(msg="queued"))
+    pipeline.stop()
+    assert sink.records == ["queued"]
@@ -0,0 +1,41 @@
+from app.extensions import request_metrics, statsd
+from tests.conftest import basic_auth
+
+OWNER = "alice.smith@gmail.com"
+
+
+def record_timings(monkeypatch):
+    stats = {}
+    monkeypatch.setattr(statsd, "timing", lambda stat, value: stats.setdefault(stat, value))
+    return stats
+
+
+def test_route_timer_and_stage_breakdown(offline_client, monkeypatch):
+    stats = record_timings(monkeypatch)
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER))
+    assert response.status_code == 200
+
+    for stat in (
+        ".route.get_assignments",
+        ".route.get_assignments.200",
+        ".route.get_assignments.stage.auth",
+        ".route.get_assignments.stage.bcrypt",
+        ".route.get_assignments.stage.db",
+        ".route.get_assignments.stage.serialize",
+    ):
+        assert stat in stats, stat
+    assert stats[".route.get_assignments"] >= stats[".route.get_assignments.stage.auth"]
+
+
+def test_error_responses_are_timed_by_status(offline_client, monkeypatch):
+    stats = record_timings(monkeypatch)
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER, "Wr0ng!pass"))
+    assert response.status_code == 401
+    assert ".route.get_assignments.401" in stats
+
+
+def test_stage_outside_a_request_stands_alone(monkeypatch):
+    stats = record_timings(monkeypatch)
+    with request_metrics.stage("sns"):
+        pass
+    assert ".stage.sns" in stats
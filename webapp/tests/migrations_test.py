@@ -0,0 +1,83 @@
+import logging.config
+import sys
+
+import pytest
+from flask_migrate import stamp, upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app, db
+from tests.conftest import WEBAPP_DIR, OfflineTestConfig, basic_auth
+
+BASELINE = "3c9f1a2b7d10"
+
+
+@pytest.fixture
+def migrated_app(tmp_path, monkeypatch):
+    """An app that leaves the schema to migrations, as deployments do"""
+    monkeypatch.chdir(WEBAPP_DIR)
+    # migrations/env.py would otherwise replace the root logger's handlers
+    monkeypatch.setattr(logging.config, "fileConfig", lambda *args, **kwargs: None)
+
+    class MigratedConfig(OfflineTestConfig):
+        DB_CREATE_ALL = False
+        READINESS_CACHE_SECONDS = 0
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'migrated.db'}"
+
+    app = create_app(MigratedConfig)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def table_names(app):
+    with app.app_context():
+        return set(inspect(db.engine).get_table_names())
+
+
+def test_a_fresh_database_is_built_by_flask_db_upgrade(migrated_app, monkeypatch):
+    startup = sys.modules["app.startup"]
+    script_reads = []
+    script_directory = startup.ScriptDirectory
+
+    def counting_script_directory(*args, **kwargs):
+        script_reads.append(1)
+        return script_directory(*args, **kwargs)
+
+    monkeypatch.setattr(startup, "ScriptDirectory", counting_script_directory)
+    client = migrated_app.test_client()
+    auth = basic_auth("alice.smith@gmail.com")
+
+    # Startup waits for the migrations instead of creating tables itself
+    assert table_names(migrated_app) == set()
+    for _ in range(2):
+        assert client.get("/v1/assignments", headers=auth).status_code == 503
+        assert client.get("/readyz").status_code == 503
+    assert client.get("/livez").status_code == 200
+
+    with migrated_app.app_context():
+        upgrade()
+    assert client.get("/v1/assignments", headers=auth).status_code == 200
+    # The migration scripts were read once, when the app started
+    assert script_reads == []
+
+
+def test_a_baseline_database_is_stamped_then_upgraded(migrated_app):
+    with migrated_app.app_context():
+        upgrade(revision=BASELINE)
+        # As if create_all had built it before migrations existed
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+        stamp(revision=BASELINE)
+        upgrade()
+    assert {"outbox_event", "idempotency_key"} <= table_names(migrated_app)
+
+
+def test_a_create_all_database_is_adopted_without_stamping(migrated_app):
+    with migrated_app.app_context():
+        upgrade(revision=BASELINE)
+        # As if create_all had built it, with no alembic_version at all
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
+        upgrade()
+    assert {"outbox_event", "idempotency_key"} <= table_names(migrated_app)
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import OutboxEvent
+from app.outbox import InMemoryTransport, outbox
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import basic_auth
+
+
+def submit(client, ass_id, email=OWNER):
+    return client.post(
+        f"/v1/assignments/{ass_id}/submission",
+        json={"submission_url": "https://example.com/hw.zip"},
+        headers=basic_auth(email),
+    )
+
+
+def test_submission_event_is_written_with_the_submission(offline_client, offline_app):
+    assignment = make_assignment(offline_client)
+    assert submit(offline_client, assignment["id"]).status_code == 201
+
+    with offline_app.app_context():
+        assert OutboxEvent.query.count() == 1
+        assert outbox.drain() == 1
+        assert OutboxEvent.query.count() == 0
+
+    message = json.loads(outbox.transport.messages[0])
+    assert message["email"] == OWNER
+    assert message["Path"].endswith("/hw/1")
+
+
+def test_failed_publish_is_retried_with_backoff(offline_client, offline_app):
+    assignment = make_assignment(offline_client)
+    submit(offline_client, assignment["id"])
+    outbox.transport.fail_next(ConnectionError("sns unreachable"))
+
+    with offline_app.app_context():
+        assert outbox.dispatch_once() == 0
+        event = OutboxEvent.query.one()
+        assert event.attempts == 1
+        assert event.next_attempt_at > datetime.utcnow()
+
+        # Not due yet, so nothing is retried
+        assert outbox.dispatch_once() == 0
+
+        event.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert outbox.dispatch_once() == 1
+    assert len(outbox.transport.messages) == 1
+
+
+def test_events_are_published_in_batches_of_ten(offline_app):
+    class CountingTransport(InMemoryTransport):
+        batch_sizes = []
+
+        def publish_batch(self, topic_arn, entries):
+            self.batch_sizes.append(len(entries))
+            return super().publish_batch(topic_arn, entries)
+
+    outbox.transport = CountingTransport()
+    with offline_app.app_context():
+        for i in range(23):
+            outbox.enqueue(f"message {i}", topic_arn="arn:aws:sns:us-east-1:0:topic")
+        db.session.commit()
+        assert outbox.drain() == 23
+    assert outbox.transport.batch_sizes == [10, 10, 3]
@@ -0,0 +1,56 @@
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Assignment, Submission
+from app.purge import assignment_purger
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import basic_auth
+
+
+def submit(client, ass_id, times):
+    for _ in range(times):
+        response = client.post(
+            f"/v1/assignments/{ass_id}/submission",
+            json={"submission_url": "https://example.com/s.zip"},
+            headers=basic_auth(OWNER),
+        )
+        assert response.status_code == 201
+
+
+def counts(app):
+    with app.app_context():
+        return (
+            db.session.scalar(select(func.count(Assignment.id))),
+            db.session.scalar(select(func.count(Submission.id))),
+        )
+
+
+def test_soft_delete_hides_the_assignment_until_purged(offline_app, offline_client, monkeypatch):
+    kept = make_assignment(offline_client, name="kept")
+    doomed = make_assignment(offline_client, name="doomed")
+    submit(offline_client, doomed["id"], 3)
+    auth = basic_auth(OWNER)
+
+    assert offline_client.delete(f"/v1/assignments/{doomed['id']}", headers=auth).status_code == 204
+    assert counts(offline_app) == (2, 3)
+
+    listed = offline_client.get("/v1/assignments", headers=auth).get_json()
+    assert [a["id"] for a in listed] == [kept["id"]]
+    for method in ("get", "put", "delete"):
+        response = getattr(offline_client, method)(f"/v1/assignments/{doomed['id']}", headers=auth)
+        assert response.status_code == 404
+
+    monkeypatch.setattr(assignment_purger, "batch_size", 2)
+    with offline_app.app_context():
+        assert assignment_purger.drain() == 1
+    assert counts(offline_app) == (1, 0)
+
+
+def test_hard_delete_cascades_in_the_database(offline_app, offline_client):
+    offline_app.config["ASSIGNMENTS_SOFT_DELETE"] = False
+    doomed = make_assignment(offline_client)
+    submit(offline_client, doomed["id"], 2)
+
+    response = offline_client.delete(f"/v1/assignments/{doomed['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 204
+    assert counts(offline_app) == (0, 0)
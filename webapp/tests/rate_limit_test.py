@@ -0,0 +1,233 @@
+import pytest
+
+from app import create_app, db
+from app.rate_limit import MemoryBackend, RateLimited, RateLimiter, RedisBackend
+from tests.auth_regression_test import AuthCostCounter
+from tests.conftest import WEBAPP_DIR, OfflineTestConfig, basic_auth
+
+OWNER = "alice.smith@gmail.com"
+WRONG = "Wr0ng!pass"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Just enough of the Redis command set for RedisBackend, with a controllable clock"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def _live(self, key):
+        if key in self.expiry and self.expiry[key] <= 0:
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def incr(self, key):
+        self._live(key)
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def set(self, key, value, px=None, ex=None, nx=False):
+        if nx and self._live(key):
+            return None
+        self.values[key] = value
+        self.expiry[key] = px if ex is None else ex * 1000
+        return True
+
+    def exists(self, key):
+        return int(self._live(key))
+
+    def pttl(self, key):
+        return self.expiry[key] if self._live(key) else -2
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+
+    def advance(self, ms):
+        for key in self.expiry:
+            self.expiry[key] -= ms
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    limiter = RateLimiter()
+    limiter.failure_threshold = 2
+    if request.param == "memory":
+        limiter.backend = MemoryBackend(clock=FakeClock())
+    else:
+        limiter.backend = RedisBackend(FakeRedis())
+    return limiter
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock)
+    assert [backend.take("ip:a", 2, 10) for _ in range(2)] == [0, 0]
+    assert backend.take("ip:a", 2, 10) == pytest.approx(5)
+    clock.now += 5
+    assert backend.take("ip:a", 2, 10) == 0
+
+
+def test_failed_logins_back_off_exponentially(limiter):
+    for _ in range(2):
+        limiter.check_backoff(OWNER)
+        limiter.record_failure(OWNER, "10.0.0.1")
+    with pytest.raises(RateLimited) as first:
+        limiter.check_backoff(OWNER)
+    assert first.value.scope == "backoff"
+    # Per-IP backoff is opt-in
+    limiter.check_ip_backoff("10.0.0.1")
+
+    limiter.record_failure(OWNER, "10.0.0.1")
+    assert limiter.backend.lock_ttl(f"backoff:email:{OWNER}") > 1
+
+    limiter.record_success(OWNER)
+    limiter.check_backoff(OWNER)
+
+
+def test_ip_backoff_when_enabled(limiter):
+    limiter.ip_backoff = True
+    for _ in range(2):
+        limiter.record_failure(OWNER, "10.0.0.1")
+    with pytest.raises(RateLimited):
+        limiter.check_ip_backoff("10.0.0.1")
+    limiter.check_ip_backoff("10.0.0.2")
+
+
+def test_memory_backend_sweeps_idle_keys():
+    clock = FakeClock()
+    backend = MemoryBackend(clock=clock, sweep_interval=60)
+    for i in range(100):
+        backend.take(f"user:{i}", 5, 10)
+        backend.incr(f"failures:{i}", 30)
+        backend.lock(f"backoff:{i}", 30)
+    clock.now += 61
+    backend.take("user:fresh", 5, 10)
+    assert (len(backend._buckets), len(backend._counters), len(backend._locks)) == (1, 0, 0)
+
+
+class BrokenRedis(FakeRedis):
+    def pipeline(self):
+        raise ConnectionRefusedError("connection refused")
+
+    def pttl(self, key):
+        raise ConnectionRefusedError("connection refused")
+
+
+def test_redis_outage_fails_open_by_default():
+    limiter = RateLimiter()
+    limiter.backend = RedisBackend(BrokenRedis())
+    limiter.check_ip("10.0.0.1")
+    limiter.check_backoff(OWNER)
+    limiter.record_failure(OWNER, "10.0.0.1")
+
+    limiter.fail_open = False
+    with pytest.raises(RateLimited) as rejected:
+        limiter.check_ip("10.0.0.1")
+    assert rejected.value.scope == "unavailable"
+
+
+def test_redis_backend_limits_per_window():
+    backend = RedisBackend(FakeRedis())
+    assert [backend.take("user:a", 2, 60) for _ in range(2)] == [0, 0]
+    assert backend.take("user:a", 2, 60) > 0
+
+
+@pytest.fixture
+def limited_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(WEBAPP_DIR)
+
+    class LimitedConfig(OfflineTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'limited.db'}"
+        AUTH_FAILURE_THRESHOLD = 2
+        RATE_LIMIT_USER_REQUESTS = 3
+
+    app = create_app(LimitedConfig)
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def test_backoff_rejects_before_database_and_bcrypt(limited_app, monkeypatch):
+    client = limited_app.test_client()
+    counter = AuthCostCounter(limited_app, monkeypatch)
+    for _ in range(2):
+        assert client.get("/v1/assignments", headers=basic_auth(OWNER, WRONG)).status_code == 401
+
+    response, bcrypt_calls, statements = counter.measure(
+        lambda: client.get("/v1/assignments", headers=basic_auth(OWNER))
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert (bcrypt_calls, statements) == (0, 0)
+
+
+def test_authenticated_email_is_rate_limited(limited_app):
+    client = limited_app.test_client()
+    statuses = [
+        client.get("/v1/assignments", headers=basic_auth(OWNER)).status_code for _ in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+
+
+@pytest.fixture
+def proxied_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(WEBAPP_DIR)
+
+    class ProxiedConfig(OfflineTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'proxied.db'}"
+        TRUSTED_PROXY_COUNT = 1
+        AUTH_FAILURE_THRESHOLD = 2
+        RATE_LIMIT_IP_REQUESTS = 4
+
+    app = create_app(ProxiedConfig)
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def get_via_alb(client, client_ip, auth):
+    return client.get(
+        "/v1/assignments", headers=dict(auth, **{"X-Forwarded-For": client_ip}),
+        environ_base={"REMOTE_ADDR": "10.0.0.254"},
+    )
+
+
+def test_clients_behind_the_load_balancer_get_their_own_limits(proxied_app):
+    client = proxied_app.test_client()
+    statuses = [get_via_alb(client, "203.0.113.1", basic_auth(OWNER)).status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 200, 429]
+    assert get_via_alb(client, "203.0.113.2", basic_auth(OWNER)).status_code == 200
+
+
+def test_failed_logins_do_not_lock_out_other_users_on_the_same_address(proxied_app):
+    client = proxied_app.test_client()
+    for _ in range(2):
+        assert get_via_alb(client, "203.0.113.1", basic_auth(OWNER, WRONG)).status_code == 401
+    assert get_via_alb(client, "203.0.113.1", basic_auth(OWNER)).status_code == 429
+    assert get_via_alb(client, "203.0.113.1", basic_auth("bob.johnson@gmail.com")).status_code == 200
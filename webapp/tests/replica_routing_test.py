@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import insert, select
+
+from app import create_app, db
+from app.db_routing import PIN_COOKIE, MemoryPinStore, RedisPinStore, replica_router
+from app.models import User
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import WEBAPP_DIR, OfflineTestConfig, basic_auth
+from tests.rate_limit_test import FakeRedis
+
+READER = "bob.johnson@gmail.com"
+
+
+@pytest.fixture
+def replicated_app(tmp_path, monkeypatch):
+    """Two SQLite files stand in for a primary and a replica that never catches up"""
+    monkeypatch.chdir(WEBAPP_DIR)
+
+    class ReplicaConfig(OfflineTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_BINDS = {"replica_0": f"sqlite:///{tmp_path / 'replica.db'}"}
+        REPLICA_PIN_SECONDS = 60
+        # Cache misses always read the primary, which would hide the routing
+        ASSIGNMENT_CACHE_MAX_SIZE = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        replica = db.engines["replica_0"]
+        db.metadata.create_all(replica)
+        users = db.session.execute(select(User.__table__)).mappings().all()
+        with replica.begin() as connection:
+            connection.execute(insert(User.__table__), [dict(u) for u in users])
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def test_reads_go_to_the_replica(replicated_app):
+    client = replicated_app.test_client()
+    make_assignment(client)
+
+    # The replica has not seen the write, so a different reader gets nothing
+    response = client.get("/v1/assignments", headers=basic_auth(READER))
+    assert response.status_code == 200
+    assert response.data == b""
+
+
+def test_writer_reads_its_own_writes_from_the_primary(replicated_app):
+    client = replicated_app.test_client()
+    created = make_assignment(client)
+
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 200
+
+    # Once the pin expires, and the browser drops the cookie, the writer reads from the replica
+    replica_router.pin_store = MemoryPinStore()
+    client.delete_cookie(PIN_COOKIE)
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 404
+
+
+def test_the_pin_cookie_reaches_workers_that_did_not_take_the_write(replicated_app):
+    client = replicated_app.test_client()
+    created = make_assignment(client)
+    # Another worker has its own, empty pin store
+    replica_router.pin_store = MemoryPinStore()
+
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 200
+
+    # The cookie is signed and bound to the writer, so it cannot pin anyone else
+    response = client.get("/v1/assignments", headers=basic_auth(READER))
+    assert response.data == b""
+    client.set_cookie(PIN_COOKIE, "forged")
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 404
+
+
+def test_a_shared_pin_store_covers_clients_without_cookies(replicated_app):
+    shared = FakeRedis()
+    replica_router.pin_store = RedisPinStore(shared)
+    created = make_assignment(replicated_app.test_client())
+
+    # A fresh client carries no cookie, but the pin is in the shared store
+    client = replicated_app.test_client()
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 200
+
+    shared.advance(60_000)
+    response = client.get(f"/v1/assignments/{created['id']}", headers=basic_auth(OWNER))
+    assert response.status_code == 404
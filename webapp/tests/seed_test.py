@@ -0,0 +1,50 @@
+import helper_func
+from app.models import User
+from tests.conftest import basic_auth
+
+HEADER = "id,first_name,last_name,email,password\n"
+
+
+def write_users(path, count, start=0):
+    rows = [
+        f"{i},First{i},Last{i},seed{i}@example.com,P@ssw0rd{i}\n"
+        for i in range(start, start + count)
+    ]
+    # A duplicate email and an invalid password are both skipped
+    rows.append(f"99,Dup,Row,seed{start}@example.com,P@ssw0rd\n")
+    rows.append("100,Weak,Password,weak@example.com,password\n")
+    path.write_text(HEADER + "".join(rows))
+    return path
+
+
+def test_seed_users_inserts_only_new_emails(offline_app, offline_client, tmp_path):
+    runner = offline_app.test_cli_runner()
+    csv_path = write_users(tmp_path / "users.csv", 6)
+
+    result = runner.invoke(args=["seed-users", "--csv", str(csv_path), "--processes", "2"])
+    assert result.exit_code == 0, result.output
+
+    write_users(csv_path, 8)
+    result = runner.invoke(args=["seed-users", "--csv", str(csv_path), "--batch-size", "3"])
+    assert result.exit_code == 0, result.output
+
+    with offline_app.app_context():
+        seeded = User.query.filter(User.email.like("seed%@example.com")).count()
+        assert seeded == 8
+        assert User.query.filter_by(email="weak@example.com").first() is None
+
+    response = offline_client.get(
+        "/v1/assignments", headers=basic_auth("seed7@example.com", "P@ssw0rd7")
+    )
+    assert response.status_code == 200
+
+
+def test_startup_seeding_hashes_without_a_process_pool(offline_app, tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("startup must not fork a process pool inside the worker")
+
+    monkeypatch.setattr(helper_func, "ProcessPoolExecutor", no_pool)
+    offline_app.config["SEED_USERS_CSV"] = str(write_users(tmp_path / "users.csv", 6))
+    with offline_app.app_context():
+        helper_func.load_users_from_csv()
+        assert User.query.filter(User.email.like("seed%@example.com")).count() == 6
@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+from app import create_app, db
+from app.extensions import statsd
+from app.models import Assignment
+from app.sql_profiler import statement_shape
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import WEBAPP_DIR, OfflineTestConfig, basic_auth
+
+CREATORS = ["alice.smith@gmail.com", "bob.johnson@gmail.com", "eve.jackson@gmail.com"]
+
+
+@pytest.fixture
+def profiled_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(WEBAPP_DIR)
+
+    class ProfiledConfig(OfflineTestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'profiled.db'}"
+        SQL_PROFILER_ENABLED = True
+        SQL_N_PLUS_ONE_THRESHOLD = 3
+
+    app = create_app(ProfiledConfig)
+    yield app
+    with app.app_context():
+        db.drop_all(bind_key=None)
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT *\n FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT * FROM t WHERE id IN (?, ?)"
+    )
+
+
+def test_headers_report_statement_count(profiled_app):
+    response = profiled_app.test_client().get("/v1/assignments", headers=basic_auth(OWNER))
+    assert response.status_code == 200
+    assert int(response.headers["X-SQL-Queries"]) >= 2
+    assert float(response.headers["X-SQL-Time-Ms"]) >= 0
+    assert response.headers["X-SQL-Repeated"] == "0"
+
+
+def test_statement_counts_are_sent_as_timings(profiled_app, monkeypatch):
+    timings, gauges = [], []
+    monkeypatch.setattr(statsd, "timing", lambda stat, value: timings.append((stat, value)))
+    monkeypatch.setattr(statsd, "gauge", lambda stat, value: gauges.append(stat))
+
+    client = profiled_app.test_client()
+    for _ in range(2):
+        response = client.get("/v1/assignments", headers=basic_auth(OWNER))
+    queries = [v for stat, v in timings if stat == ".sql.get_assignments.queries"]
+    assert queries == [int(response.headers["X-SQL-Queries"])] * 2
+    assert not any(stat.startswith(".sql.") for stat in gauges)
+
+
+def test_repeated_statement_shapes_are_flagged(profiled_app, caplog):
+    @profiled_app.route("/lazy-creators")
+    def lazy_creators():
+        # Touching the lazy backref once per row is the classic N+1
+        return {"creators": [a.creator.email for a in Assignment.query.all()]}
+
+    client = profiled_app.test_client()
+    for email in CREATORS:
+        make_assignment(client, name=email, auth=basic_auth(email))
+
+    with caplog.at_level(logging.WARNING):
+        response = client.get("/lazy-creators")
+    assert response.status_code == 200
+    assert response.headers["X-SQL-Repeated"] == "1"
+    assert any("Possible N+1 in lazy_creators" in r.getMessage() for r in caplog.records)
+
+
+def test_profiler_is_off_by_default(offline_client):
+    response = offline_client.get("/v1/assignments", headers=basic_auth(OWNER))
+    assert "X-SQL-Queries" not in response.headers
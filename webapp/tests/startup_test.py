@@ -0,0 +1,49 @@
+from sqlalchemy import inspect
+
+from app import create_app, db
+from app.startup import StartupReport, warm_up
+from tests.conftest import WEBAPP_DIR, OfflineTestConfig, basic_auth
+
+
+def make_lazy_app(tmp_path):
+    class LazyConfig(OfflineTestConfig):
+        LAZY_INIT = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'lazy.db'}"
+
+    return create_app(LazyConfig)
+
+
+def table_names(app):
+    with app.app_context():
+        return inspect(db.engine).get_table_names()
+
+
+def test_lazy_app_defers_schema_until_first_request(tmp_path, monkeypatch):
+    monkeypatch.chdir(WEBAPP_DIR)
+    app = make_lazy_app(tmp_path)
+    assert table_names(app) == []
+
+    response = app.test_client().get("/v1/assignments", headers=basic_auth("alice.smith@gmail.com"))
+    assert response.status_code == 200
+    assert "user" in table_names(app)
+
+
+def test_warm_up_hook_prepares_a_lazy_app(tmp_path, monkeypatch):
+    monkeypatch.chdir(WEBAPP_DIR)
+    app = make_lazy_app(tmp_path)
+    warm_up(app)
+    assert "assignment" in table_names(app)
+
+
+def test_startup_report_publishes_phase_timers():
+    class RecordingStats:
+        timings = []
+
+        def timing(self, stat, ms):
+            self.timings.append(stat)
+
+    report = StartupReport(RecordingStats())
+    with report.phase("config"):
+        pass
+    report.emit()
+    assert RecordingStats.timings == [".startup.config", ".startup.total"]
@@ -0,0 +1,70 @@
+import socket
+
+import pytest
+from flask import Flask
+
+from app.stats_buffer import BufferedStatsClient
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2)
+    yield sock
+    sock.close()
+
+
+def packets(sock):
+    received = []
+    sock.settimeout(0.2)
+    try:
+        while True:
+            received.append(sock.recv(4096).decode())
+    except socket.timeout:
+        return received
+
+
+def make_client(listener, **config):
+    client = BufferedStatsClient("127.0.0.1", listener.getsockname()[1], prefix="webapp")
+    app = Flask(__name__)
+    app.config.update(config)
+    client.init_app(app)
+
+    @app.route("/work")
+    def work():
+        client.incr(".auth.cache.hit")
+        client.timing(".route.work", 1.5)
+        client.incr(".auth.cache.hit")
+        return "ok"
+
+    return client, app
+
+
+def test_request_metrics_arrive_as_one_packet(listener):
+    client, app = make_client(listener)
+    assert app.test_client().get("/work").status_code == 200
+    assert packets(listener) == [
+        "webapp..auth.cache.hit:1|c\nwebapp..route.work:1.500000|ms\nwebapp..auth.cache.hit:1|c"
+    ]
+
+
+def test_metrics_outside_a_request_are_sent_immediately(listener):
+    client, _ = make_client(listener)
+    client.incr(".outbox.published")
+    assert packets(listener) == ["webapp..outbox.published:1|c"]
+
+
+def test_aggregator_sums_counters_per_flush(listener):
+    client, app = make_client(listener, STATSD_AGGREGATE_INTERVAL=60)
+    http = app.test_client()
+    http.get("/work")
+    http.get("/work")
+    client.gauge(".db.pool.primary.checked_out", 3)
+    client.aggregator.flush()
+    (packet,) = packets(listener)
+    lines = packet.split("\n")
+    assert "webapp..auth.cache.hit:4|c" in lines
+    assert "webapp..db.pool.primary.checked_out:3|g" in lines
+    assert lines.count("webapp..route.work:1.500000|ms") == 2
+    client.aggregator.stop()
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import Submission, User
+from tests.assignments_test import OWNER, make_assignment
+from tests.conftest import basic_auth
+
+OTHER = "bob.johnson@gmail.com"
+START = datetime(2030, 1, 1)
+
+
+def seed_submissions(app, ass_id, email, count):
+    """Insert submissions one hour apart from START, returning their ids in date order"""
+    with app.app_context():
+        user_id = db.session.scalar(select(User.id).where(User.email == email))
+        db.session.execute(insert(Submission), [
+            {"assignment_id": ass_id, "user_id": user_id,
+             "submission_url": "https://example.com/s.zip",
+             "submission_date": START + timedelta(hours=i), "assignment_updated": START}
+            for i in range(count)
+        ])
+        db.session.commit()
+        return db.session.scalars(
+            select(Submission.id)
+            .where(Submission.assignment_id == ass_id, Submission.user_id == user_id)
+            .order_by(Submission.submission_date, Submission.id)
+        ).all()
+
+
+def walk(client, path, email, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get(path, query_string=query, headers=basic_auth(email))
+        assert response.status_code == 200
+        seen += [s["id"] for s in response.get_json() or []]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+
+
+def test_creator_pages_through_an_assignments_submissions(offline_app, offline_client):
+    assignment = make_assignment(offline_client)
+    ids = seed_submissions(offline_app, assignment["id"], OWNER, 4)
+    ids += seed_submissions(offline_app, assignment["id"], OTHER, 3)
+    path = f"/v1/assignments/{assignment['id']}/submissions"
+
+    assert sorted(walk(offline_client, path, OWNER, limit=2)) == sorted(ids)
+
+    page = offline_client.get(path, query_string={"limit": 1}, headers=basic_auth(OWNER))
+    assert set(page.get_json()[0]) == set(Submission.SERIALIZED_COLUMNS)
+    assert offline_client.get(path, headers=basic_auth(OTHER)).status_code == 403
+
+
+def test_user_listing_filters_by_assignment_and_date(offline_app, offline_client):
+    first = make_assignment(offline_client, name="first")
+    second = make_assignment(offline_client, name="second")
+    first_ids = seed_submissions(offline_app, first["id"], OTHER, 5)
+    second_ids = seed_submissions(offline_app, second["id"], OTHER, 2)
+    seed_submissions(offline_app, first["id"], OWNER, 2)
+
+    assert sorted(walk(offline_client, "/v1/submissions", OTHER, limit=3)) == sorted(
+        first_ids + second_ids
+    )
+    assert walk(offline_client, "/v1/submissions", OTHER, assignment_id=second["id"]) == second_ids
+
+    window = {
+        "assignment_id": first["id"],
+        "since": (START + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "until": (START + timedelta(hours=3)).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    }
+    assert walk(offline_client, "/v1/submissions", OTHER, limit=1, **window) == first_ids[1:3]
+
+
+def test_submissions_of_deleted_assignments_are_hidden(offline_app, offline_client):
+    assignment = make_assignment(offline_client)
+    seed_submissions(offline_app, assignment["id"], OTHER, 2)
+    offline_client.delete(f"/v1/assignments/{assignment['id']}", headers=basic_auth(OWNER))
+
+    assert walk(offline_client, "/v1/submissions", OTHER) == []
+    response = offline_client.get(
+        f"/v1/assignments/{assignment['id']}/submissions", headers=basic_auth(OWNER)
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": "0"}, {"cursor": "not-a-cursor"}, {"since": "yesterday"}, {"until": "2030-01-01"},
+])
+def test_invalid_listing_parameters_are_rejected(offline_client, params):
+    response = offline_client.get(
+        "/v1/submissions", query_string=params, headers=basic_auth(OTHER)
+    )
+    assert response.status_code == 400